@@ -1,16 +1,43 @@
 from abc import ABC, abstractmethod
 from copy import deepcopy
 
+def clone_with_overrides(obj, overrides):
+    """
+    Clone an object, deep-copying only the fields that are not overridden.
+
+    Args:
+        obj: The object to clone.
+        overrides (dict): Field values to set on the clone as they are.
+
+    Returns:
+        A new instance of the object's class.
+    """
+    state = vars(obj)
+    unknown = overrides.keys() - state.keys()
+    if unknown:
+        raise TypeError(f"{type(obj).__name__} has no field(s) {', '.join(sorted(unknown))}")
+    clone = type(obj).__new__(type(obj))
+    memo = {}
+    for name, value in state.items():
+        if name not in overrides:
+            setattr(clone, name, deepcopy(value, memo))
+    for name, value in overrides.items():
+        setattr(clone, name, value)
+    return clone
+
 class Prototype(ABC):
     """
     Abstract base class defining the interface for cloning.
     """
 
     @abstractmethod
-    def clone(self):
+    def clone(self, **overrides):
         """
         Create and return a clone of the object.
 
+        Args:
+            **overrides: Field values to use in the clone instead of copies of the prototype's.
+
         Returns:
             Prototype: A new instance cloned from the prototype.
         """
@@ -36,14 +63,21 @@ class Document(Prototype):
         self.formatting = formatting
         self.annotations = deepcopy(annotations)
 
-    def clone(self):
+    def clone(self, **overrides):
         """
         Create and return a clone of the document.
 
+        Overridden fields are set directly on the clone and never copied.
+
+        Args:
+            **overrides: Field values to use in the clone instead of copies of the prototype's.
+
         Returns:
             Document: A new instance cloned from the prototype.
         """
-        return Document(self.content, self.images, self.formatting, self.annotations)
+        if not overrides:
+            return Document(self.content, self.images, self.formatting, self.annotations)
+        return clone_with_overrides(self, overrides)
 
     def display(self):
         """
@@ -75,3 +109,8 @@ if __name__ == "__main__":
     original_doc.display()
     print("\nCopied Document:")
     cloned_doc.display()
+
+    # Clone with overrides: the replaced images are never copied
+    override_doc = original_doc.clone(content="Override Content", images=["Image3.png"])
+    print("\nOverridden Document:")
+    override_doc.display()
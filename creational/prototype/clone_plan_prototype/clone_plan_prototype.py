@@ -0,0 +1,153 @@
+import timeit
+from copy import deepcopy
+
+# Types whose instances can be shared between a prototype and its clones
+IMMUTABLE_TYPES = frozenset((str, bytes, int, float, complex, bool, type(None), frozenset))
+
+# How a field is copied by a clone plan
+REFERENCE = "reference"  # Share the value, for immutable fields
+SHALLOW = "shallow"      # Copy the list, for lists of immutable values
+DEEP = "deep"            # Fall back to deepcopy, for anything else
+
+def classify(value):
+    """
+    Pick the cheapest way to copy a value that keeps the clone independent.
+
+    Args:
+        value: The field value to classify.
+
+    Returns:
+        str: One of REFERENCE, SHALLOW or DEEP.
+    """
+    if type(value) in IMMUTABLE_TYPES:
+        return REFERENCE
+    if type(value) is list and all(type(item) in IMMUTABLE_TYPES for item in value):
+        return SHALLOW
+    return DEEP
+
+def build_clone_plan(fields, checked=False):
+    """
+    Generate a clone function specialised for the given fields.
+
+    Args:
+        fields (dict): Mapping of field name to REFERENCE, SHALLOW or DEEP.
+        checked (bool): Whether the clone function first checks that each value still
+            fits its kind, and falls back to deepcopy for the whole object when one does not.
+
+    Returns:
+        function: A clone function copying exactly those fields.
+    """
+    copies = {REFERENCE: "state[{!r}]", SHALLOW: "state[{!r}][:]", DEEP: "deepcopy(state[{!r}])"}
+    guards = {
+        REFERENCE: "type(state[{0!r}]) in immutable",
+        SHALLOW: "type(state[{0!r}]) is list and all(type(item) in immutable for item in state[{0!r}])",
+    }
+    lines = ["def clone(self):", "    state = self.__dict__"]
+    conditions = [guards[kind].format(name) for name, kind in fields.items() if kind in guards]
+    if checked and conditions:
+        lines.append(f"    if not ({' and '.join(conditions)}):")
+        lines.append("        return deepcopy(self)")
+    lines.append("    new = new_instance(type(self))")
+    items = ", ".join(f"{name!r}: {copies[kind].format(name)}" for name, kind in fields.items())
+    lines.append(f"    new.__dict__.update({{{items}}})")
+    lines.append("    return new")
+
+    namespace = {"new_instance": object.__new__, "deepcopy": deepcopy, "immutable": IMMUTABLE_TYPES}
+    exec("\n".join(lines), namespace)
+    return namespace["clone"]
+
+def prototype(cls=None, *, fields=None):
+    """
+    Decorator function to add planned prototype functionality to a class.
+
+    Instead of walking each object with deepcopy, the decorator builds a clone function
+    for the class once. The plan comes from the declared `fields` mapping, which is
+    trusted, or is inferred from the first instance that is cloned. An inferred plan
+    checks on every clone that each value still has the kind it was planned for, e.g.
+    that a list still holds only immutable values. An instance whose attributes or values
+    do not match the plan is cloned with deepcopy.
+
+    Args:
+        cls: The class to be decorated as a prototype.
+        fields (dict): Optional mapping of field name to REFERENCE, SHALLOW or DEEP.
+
+    Returns:
+        The decorated class with prototype functionality.
+    """
+    def decorate(cls):
+        plan = {}  # Shared with subclasses, whose extra attributes make them fall back to deepcopy
+
+        def clone(self):
+            if "clone" not in plan:
+                # Analyse the class on first use when no field spec was declared
+                spec = fields or {name: classify(value) for name, value in self.__dict__.items()}
+                plan["names"] = spec.keys()
+                plan["clone"] = build_clone_plan(spec, checked=not fields)
+            if self.__dict__.keys() != plan["names"]:
+                return deepcopy(self)
+            return plan["clone"](self)
+
+        cls.clone = clone
+        return cls
+
+    if cls is None:
+        return decorate
+    return decorate(cls)
+
+@prototype(fields={"content": REFERENCE, "images": SHALLOW, "formatting": REFERENCE, "annotations": SHALLOW})
+class Document:
+    def __init__(self, content, images, formatting, annotations):
+        """
+        Initialize a document object.
+
+        Args:
+            content (str): The content of the document.
+            images (list): List of images in the document.
+            formatting (str): The formatting style of the document.
+            annotations (list): List of annotations in the document.
+        """
+        self.content = content
+        self.images = images
+        self.formatting = formatting
+        self.annotations = annotations
+
+    def display(self):
+        """Display the contents of the document."""
+        print("Content:", self.content)
+        print("Images:", self.images)
+        print("Formatting:", self.formatting)
+        print("Annotations:", self.annotations)
+
+@prototype
+class InferredDocument(Document):
+    """The same document with a clone plan inferred from its first instance."""
+
+class DeepCopyDocument(Document):
+    """The same document cloned with the lambda used by the decorator_prototype example."""
+
+    def clone(self):
+        return deepcopy(self)
+
+if __name__ == "__main__":
+    # Create a prototype document and clone it
+    original_doc = Document("Prototype Document", ["Image1.png"], "Basic", ["Annotation1"])
+    cloned_doc = original_doc.clone()
+
+    # Making changes to the original document
+    original_doc.images.append("Image2.png")
+    original_doc.annotations.append("Annotation2")
+    original_doc.content = "Updated Content"
+
+    print("Original Document:")
+    original_doc.display()
+    print("\nCloned Document:")
+    cloned_doc.display()
+
+    # Compare clones/sec of the planned clones against deepcopy
+    args = ("Benchmark", [f"Image{i}.png" for i in range(10)], "Basic", [f"Annotation{i}" for i in range(10)])
+    number = 50000
+    print()
+    for doc_cls in (DeepCopyDocument, InferredDocument, Document):
+        doc = doc_cls(*args)
+        elapsed = timeit.timeit(doc.clone, number=number)
+        print(f"{doc_cls.__name__:17} {number / elapsed:12.0f} clones/sec")
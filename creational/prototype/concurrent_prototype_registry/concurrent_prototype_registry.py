@@ -0,0 +1,176 @@
+import threading
+import time
+from copy import deepcopy
+from types import MappingProxyType
+
+def prototype(cls):
+    """
+    Decorator function to add prototype functionality to a class.
+
+    Args:
+        cls: The class to be decorated as a prototype.
+
+    Returns:
+        The decorated class with prototype functionality.
+    """
+    # Add a clone method to the class
+    cls.clone = lambda self: deepcopy(self)
+    return cls
+
+class ConcurrentPrototypeRegistry:
+    """
+    Prototype registry whose readers never block.
+
+    Lookups read an immutable snapshot of the registered prototypes. Writers build a new
+    snapshot under a lock and publish it with a single attribute assignment, which is atomic.
+    """
+
+    def __init__(self):
+        """Initialize the prototype registry."""
+        self._write_lock = threading.Lock()  # Serialises writers only
+        self.prototypes = MappingProxyType({})
+
+    def register(self, name, prototype):
+        """
+        Register a prototype with a given name.
+
+        Args:
+            name (str): The name of the prototype.
+            prototype: The prototype object to register.
+        """
+        with self._write_lock:
+            snapshot = dict(self.prototypes)
+            snapshot[name] = prototype
+            self.prototypes = MappingProxyType(snapshot)
+
+    def unregister(self, name):
+        """
+        Remove a prototype from the registry.
+
+        Args:
+            name (str): The name of the prototype to remove.
+        """
+        with self._write_lock:
+            snapshot = dict(self.prototypes)
+            del snapshot[name]
+            self.prototypes = MappingProxyType(snapshot)
+
+    def get(self, name):
+        """
+        Retrieve a prototype by name.
+
+        Args:
+            name (str): The name of the prototype to retrieve.
+
+        Returns:
+            The cloned instance of the prototype.
+        """
+        # Read the snapshot once so that the lookup sees a consistent registry
+        prototype = self.prototypes.get(name)
+        if prototype is None:
+            raise KeyError(f"Prototype '{name}' not found.")
+        return prototype.clone()
+
+class LockedPrototypeRegistry:
+    """The naive alternative: every register and get holds one global lock."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.prototypes = {}
+
+    def register(self, name, prototype):
+        with self._lock:
+            self.prototypes[name] = prototype
+
+    def get(self, name):
+        with self._lock:
+            if name in self.prototypes:
+                return self.prototypes[name].clone()
+            else:
+                raise KeyError(f"Prototype '{name}' not found.")
+
+@prototype
+class Document:
+    def __init__(self, content, images, formatting, annotations):
+        """
+        Initialize a document object.
+
+        Args:
+            content (str): The content of the document.
+            images (list): List of images in the document.
+            formatting (str): The formatting style of the document.
+            annotations (list): List of annotations in the document.
+        """
+        self.content = content
+        self.images = images
+        self.formatting = formatting
+        self.annotations = annotations
+
+    def display(self):
+        """Display the contents of the document."""
+        print("Content:", self.content)
+        print("Images:", self.images)
+        print("Formatting:", self.formatting)
+        print("Annotations:", self.annotations)
+
+def run_workload(registry, threads, operations, write_every):
+    """
+    Hammer a registry from several threads and return the operations per second.
+
+    Args:
+        registry: The registry under test.
+        threads (int): The number of worker threads.
+        operations (int): The number of operations each thread performs.
+        write_every (int): Every write_every-th operation is a register, 0 for read-only.
+
+    Returns:
+        float: Operations per second across all threads.
+    """
+    template = Document("Template", ["Image1.png"], "Basic", ["Annotation1"])
+    for i in range(16):
+        registry.register(f"doc{i}", template)
+
+    def worker(seed):
+        for i in range(operations):
+            name = f"doc{(seed + i) % 16}"
+            if write_every and i % write_every == 0:
+                registry.register(name, template)
+            else:
+                registry.get(name)
+
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return threads * operations / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    # Create a prototype registry
+    registry = ConcurrentPrototypeRegistry()
+
+    # Register prototype documents
+    registry.register("basic", Document("Basic Document", [], "Basic", []))
+    registry.register("advanced", Document("Advanced Document", ["Image1.png"], "Advanced", ["Annotation1"]))
+
+    # Register and retrieve from several threads at once
+    threads = [
+        threading.Thread(target=lambda i=i: registry.register(f"doc{i}", registry.get("basic")))
+        for i in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(sorted(registry.prototypes))  # Output: ['advanced', 'basic', 'doc0', ..., 'doc4']
+
+    print("\nAdvanced Document:")
+    registry.get("advanced").display()
+
+    # Compare throughput against a registry behind one global lock
+    print()
+    for label, write_every in (("read-heavy", 0), ("mixed", 10)):
+        for registry_cls in (LockedPrototypeRegistry, ConcurrentPrototypeRegistry):
+            ops = run_workload(registry_cls(), threads=8, operations=20000, write_every=write_every)
+            print(f"{label:10} {registry_cls.__name__:28} {ops:10.0f} ops/sec")
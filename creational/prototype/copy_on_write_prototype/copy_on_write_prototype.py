@@ -0,0 +1,319 @@
+import json
+import timeit
+from collections.abc import MutableSequence
+from copy import deepcopy
+
+# Types whose instances can be shared between a prototype and its clones
+IMMUTABLE_TYPES = frozenset((str, bytes, int, float, complex, bool, type(None), frozenset))
+
+class CowList(MutableSequence):
+    """
+    List wrapper that shares its storage with other CowLists until it is written to.
+
+    Shared storage is a tuple, so no CowList can change it: the first write copies it into
+    a list owned by the writer, and sharing or reading never modifies a CowList. The
+    elements themselves are shared, so they must be immutable values such as file names
+    or annotation strings. The full list API is supported; results of `+`, `*`, slicing
+    and `copy` are plain lists, and `json_default` lets json serialise CowLists.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data=()):
+        """
+        Initialize the CowList.
+
+        Args:
+            data (iterable): The initial elements; a tuple is shared instead of copied.
+        """
+        self._data = data if type(data) is tuple else tuple(data)
+
+    def share(self):
+        """
+        Create a CowList sharing this list's storage.
+
+        Storage that has been written to is frozen into a new tuple for the clone, this
+        list keeps its own.
+
+        Returns:
+            CowList: A new CowList with the same elements.
+        """
+        return CowList(self._data)
+
+    def _own(self):
+        """Copy the shared storage into a list of our own before the first write."""
+        data = self._data
+        if type(data) is tuple:
+            data = self._data = list(data)
+        return data
+
+    def _list(self):
+        """Return the elements as a list, copying only if the storage is shared."""
+        data = self._data
+        return data if type(data) is list else list(data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._data[index])
+        return self._data[index]
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __reversed__(self):
+        return reversed(self._data)
+
+    def __contains__(self, value):
+        return value in self._data
+
+    def index(self, value, *args):
+        return self._data.index(value, *args)
+
+    def count(self, value):
+        return self._data.count(value)
+
+    def copy(self):
+        return list(self._data)
+
+    def __setitem__(self, index, value):
+        self._own()[index] = value
+
+    def __delitem__(self, index):
+        del self._own()[index]
+
+    def insert(self, index, value):
+        self._own().insert(index, value)
+
+    def append(self, value):
+        self._own().append(value)
+
+    def extend(self, values):
+        self._own().extend(values)
+
+    def pop(self, index=-1):
+        return self._own().pop(index)
+
+    def remove(self, value):
+        self._own().remove(value)
+
+    def clear(self):
+        self._data = ()
+
+    def sort(self, *, key=None, reverse=False):
+        self._own().sort(key=key, reverse=reverse)
+
+    def reverse(self):
+        self._own().reverse()
+
+    def __iadd__(self, values):
+        self._own().extend(values)
+        return self
+
+    def __imul__(self, n):
+        self._own()[:] = self._data * n
+        return self
+
+    def __add__(self, other):
+        if isinstance(other, CowList):
+            other = other._data
+        if not isinstance(other, (list, tuple)):
+            return NotImplemented
+        return self._list() + list(other)
+
+    def __radd__(self, other):
+        if not isinstance(other, list):
+            return NotImplemented
+        return other + self._list()
+
+    def __mul__(self, n):
+        return self._list() * n
+
+    __rmul__ = __mul__
+
+    def _compared(self, other):
+        """Return the list to compare against, or None if other is not list-like."""
+        if isinstance(other, CowList):
+            return other._list()
+        return other if isinstance(other, list) else None
+
+    def __eq__(self, other):
+        other = self._compared(other)
+        return NotImplemented if other is None else self._list() == other
+
+    def __lt__(self, other):
+        other = self._compared(other)
+        return NotImplemented if other is None else self._list() < other
+
+    def __le__(self, other):
+        other = self._compared(other)
+        return NotImplemented if other is None else self._list() <= other
+
+    def __gt__(self, other):
+        other = self._compared(other)
+        return NotImplemented if other is None else self._list() > other
+
+    def __ge__(self, other):
+        other = self._compared(other)
+        return NotImplemented if other is None else self._list() >= other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self._list())
+
+    def __copy__(self):
+        return self.share()
+
+    def __deepcopy__(self, memo):
+        return self.share()
+
+    def __reduce__(self):
+        return CowList, (tuple(self._data),)
+
+def json_default(value):
+    """
+    Serialise CowLists as JSON arrays, for use as `json.dumps(..., default=json_default)`.
+
+    Args:
+        value: An object json cannot serialise by itself.
+
+    Returns:
+        list: The CowList's elements.
+    """
+    if isinstance(value, CowList):
+        return value._list()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def prototype(cls):
+    """
+    Decorator function to add copy-on-write prototype functionality to a class.
+
+    List attributes whose items are all immutable are stored as CowLists, so a clone
+    shares them with its prototype until either side mutates them. Cloning never writes
+    to the prototype, so a template can be cloned from many threads at once. Immutable
+    attributes are shared by reference and any other attribute, including lists of
+    mutable items, is deep-copied.
+
+    Args:
+        cls: The class to be decorated as a prototype.
+
+    Returns:
+        The decorated class with prototype functionality.
+    """
+    def __setattr__(self, name, value):
+        # Wrap plain lists of immutable values so that they can be shared by later clones
+        if type(value) is list and all(type(item) in IMMUTABLE_TYPES for item in value):
+            value = CowList(value)
+        object.__setattr__(self, name, value)
+
+    def clone(self):
+        new = type(self).__new__(type(self))
+        state = new.__dict__
+        for name, value in self.__dict__.items():
+            if type(value) is CowList:
+                state[name] = value.share()
+            elif type(value) in IMMUTABLE_TYPES:
+                state[name] = value
+            else:
+                state[name] = deepcopy(value)
+        return new
+
+    cls.__setattr__ = __setattr__
+    cls.clone = clone
+    return cls
+
+@prototype
+class Document:
+    def __init__(self, content, images, formatting, annotations):
+        """
+        Initialize a document object.
+
+        Args:
+            content (str): The content of the document.
+            images (list): List of images in the document.
+            formatting (str): The formatting style of the document.
+            annotations (list): List of annotations in the document.
+        """
+        self.content = content
+        self.images = images
+        self.formatting = formatting
+        self.annotations = annotations
+
+    def display(self):
+        """Display the contents of the document."""
+        print("Content:", self.content)
+        print("Images:", self.images)
+        print("Formatting:", self.formatting)
+        print("Annotations:", self.annotations)
+
+class DeepCopyDocument:
+    """The same document cloned with the eager deepcopy used by the decorator_prototype example."""
+
+    def __init__(self, content, images, formatting, annotations):
+        self.content = content
+        self.images = images
+        self.formatting = formatting
+        self.annotations = annotations
+
+    def clone(self):
+        return deepcopy(self)
+
+if __name__ == "__main__":
+    # Create a prototype document and clone it
+    original_doc = Document("Prototype Document", ["Image1.png"], "Basic", ["Annotation1"])
+    cloned_doc = original_doc.clone()
+
+    # The clone shares the prototype's lists until one of them is written to
+    print(original_doc.images._data is cloned_doc.images._data)  # Output: True
+
+    # Making changes to the original document copies only the images list
+    original_doc.images.append("Image2.png")
+    print(original_doc.images._data is cloned_doc.images._data)  # Output: False
+    print(original_doc.annotations._data is cloned_doc.annotations._data)  # Output: True
+
+    # Making changes to the clone leaves the original untouched
+    cloned_doc.annotations.append("Annotation2")
+    cloned_doc.content = "Cloned Content"
+
+    print("\nOriginal Document:")
+    original_doc.display()
+    print("\nCloned Document:")
+    cloned_doc.display()
+
+    # CowLists support the whole list API, and JSON through json_default
+    cloned_doc.images.sort(reverse=True)
+    print("\n" + json.dumps(cloned_doc.images + original_doc.images))  # Output: ["Image1.png", "Image1.png", "Image2.png"]
+    print(json.dumps(vars(cloned_doc), default=json_default))
+
+    # Compare cloning cost against the eager deepcopy path
+    images = [f"Image{i}.png" for i in range(100)]
+    annotations = [f"Annotation{i}" for i in range(100)]
+    cow_doc = Document("Benchmark", images, "Basic", annotations)
+    deep_doc = DeepCopyDocument("Benchmark", images, "Basic", annotations)
+
+    number = 10000
+    cow_time = timeit.timeit(cow_doc.clone, number=number)
+    deep_time = timeit.timeit(deep_doc.clone, number=number)
+    print(f"\ndeepcopy clone:                  {number / deep_time:12.0f} clones/sec")
+    print(f"copy-on-write clone:             {number / cow_time:12.0f} clones/sec")
+
+    # Most clones are only read, so include reading every list of the clone
+    def read(doc):
+        return len(doc.images) + sum(len(annotation) for annotation in doc.annotations)
+
+    cow_read_time = timeit.timeit(lambda: read(cow_doc.clone()), number=number)
+    deep_read_time = timeit.timeit(lambda: read(deep_doc.clone()), number=number)
+    print(f"deepcopy clone, then read:       {number / deep_read_time:12.0f} clones/sec")
+    print(f"copy-on-write clone, then read:  {number / cow_read_time:12.0f} clones/sec")
+
+    # A clone that is written to pays for copying the list it changes
+    def write(doc):
+        doc.annotations.append("Reviewed")
+
+    cow_write_time = timeit.timeit(lambda: write(cow_doc.clone()), number=number)
+    deep_write_time = timeit.timeit(lambda: write(deep_doc.clone()), number=number)
+    print(f"deepcopy clone, then write:      {number / deep_write_time:12.0f} clones/sec")
+    print(f"copy-on-write clone, then write: {number / cow_write_time:12.0f} clones/sec")
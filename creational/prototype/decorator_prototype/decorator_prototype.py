@@ -10,8 +10,35 @@ def prototype(cls):
     Returns:
         The decorated class with prototype functionality.
     """
+    def clone(self, **overrides):
+        """
+        Create and return a clone of the object.
+
+        Overridden fields are set directly on the clone and never copied.
+
+        Args:
+            **overrides: Field values to use in the clone instead of copies of the prototype's.
+
+        Returns:
+            A new instance cloned from the prototype.
+        """
+        if not overrides:
+            return deepcopy(self)
+        state = vars(self)
+        unknown = overrides.keys() - state.keys()
+        if unknown:
+            raise TypeError(f"{type(self).__name__} has no field(s) {', '.join(sorted(unknown))}")
+        new = type(self).__new__(type(self))
+        memo = {}
+        for name, value in state.items():
+            if name not in overrides:
+                setattr(new, name, deepcopy(value, memo))
+        for name, value in overrides.items():
+            setattr(new, name, value)
+        return new
+
     # Add a clone method to the class
-    cls.clone = lambda self: deepcopy(self)
+    cls.clone = clone
     return cls
 
 @prototype
@@ -63,3 +90,8 @@ if __name__ == "__main__":
     original_doc.display()
     print("\nCopied Document:")
     cloned_doc.display()
+
+    # Clone with overrides: the replaced images are never copied
+    override_doc = original_doc.clone(content="Override Content", images=["Image3.png"])
+    print("\nOverridden Document:")
+    override_doc.display()
@@ -0,0 +1,240 @@
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import time
+from copy import deepcopy
+
+def prototype(cls):
+    """
+    Decorator function to add prototype functionality to a class.
+
+    Args:
+        cls: The class to be decorated as a prototype.
+
+    Returns:
+        The decorated class with prototype functionality.
+    """
+    # Add a clone method to the class
+    cls.clone = lambda self: deepcopy(self)
+    return cls
+
+# File layout: header, pickled prototypes, names, then an index sorted by name.
+# Header: magic, number of prototypes, offset of the index.
+HEADER = struct.Struct("<8sQQ")
+# Index entry: name offset, name length, record offset, record length.
+ENTRY = struct.Struct("<QIQI")
+MAGIC = b"PROTOREG"
+
+class MappedPrototypeRegistry:
+    """
+    Prototype registry backed by a memory-mapped file.
+
+    Opening the registry only maps the file and reads its header, so startup does not
+    depend on the number of stored prototypes. A prototype is unpickled on its first get,
+    found by binary search over the sorted index. Files are unpickled, so only open
+    files written by a trusted source.
+    """
+
+    def __init__(self, path=None):
+        """
+        Initialize the prototype registry.
+
+        Args:
+            path (str): Optional file written by `save` to load prototypes from lazily.
+        """
+        self.prototypes = {}  # Prototypes registered or already decoded
+        self._mapped = None
+        self._count = 0
+        self._index_offset = 0
+        if path is not None:
+            with open(path, "rb") as file:
+                self._mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self._count, self._index_offset = HEADER.unpack_from(self._mapped, 0)
+            if magic != MAGIC:
+                raise ValueError(f"'{path}' is not a prototype registry file.")
+
+    def register(self, name, prototype):
+        """
+        Register a prototype with a given name.
+
+        Args:
+            name (str): The name of the prototype.
+            prototype: The prototype object to register.
+        """
+        self.prototypes[name] = prototype
+
+    def get(self, name):
+        """
+        Retrieve a prototype by name.
+
+        Args:
+            name (str): The name of the prototype to retrieve.
+
+        Returns:
+            The cloned instance of the prototype.
+        """
+        prototype = self.prototypes.get(name)
+        if prototype is None:
+            prototype = self._load(name)
+            if prototype is None:
+                raise KeyError(f"Prototype '{name}' not found.")
+            self.prototypes[name] = prototype
+        return prototype.clone()
+
+    def names(self):
+        """
+        List the names of all prototypes, registered or stored in the file.
+
+        Returns:
+            list: The sorted prototype names.
+        """
+        names = set(self.prototypes)
+        for position in range(self._count):
+            names.add(self._name_at(position).decode())
+        return sorted(names)
+
+    def save(self, path):
+        """
+        Write every prototype to a file that can be opened lazily later.
+
+        Args:
+            path (str): The file to write.
+        """
+        records = {}
+        for name in self.names():
+            prototype = self.prototypes.get(name)
+            if prototype is None:
+                prototype = self._load(name)
+            records[name.encode()] = pickle.dumps(prototype, pickle.HIGHEST_PROTOCOL)
+
+        names = sorted(records)
+        # Write next to the target and swap it in, the old file may still be mapped
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, 0, 0))
+            record_offsets = []
+            for name in names:
+                record_offsets.append(file.tell())
+                file.write(records[name])
+            name_offsets = []
+            for name in names:
+                name_offsets.append(file.tell())
+                file.write(name)
+            index_offset = file.tell()
+            for name, name_offset, record_offset in zip(names, name_offsets, record_offsets):
+                file.write(ENTRY.pack(name_offset, len(name), record_offset, len(records[name])))
+            file.seek(0)
+            file.write(HEADER.pack(MAGIC, len(names), index_offset))
+        os.replace(temporary_path, path)
+
+    def close(self):
+        """Unmap the backing file."""
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+            self._count = 0
+
+    def _entry(self, position):
+        return ENTRY.unpack_from(self._mapped, self._index_offset + position * ENTRY.size)
+
+    def _name_at(self, position):
+        name_offset, name_length, _, _ = self._entry(position)
+        return self._mapped[name_offset:name_offset + name_length]
+
+    def _load(self, name):
+        """
+        Decode a prototype from the mapped file.
+
+        Args:
+            name (str): The name of the prototype to decode.
+
+        Returns:
+            The stored prototype, or None if the file does not contain it.
+        """
+        key = name.encode()
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._name_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._name_at(low) == key:
+            _, _, record_offset, record_length = self._entry(low)
+            return pickle.loads(self._mapped[record_offset:record_offset + record_length])
+        return None
+
+@prototype
+class Document:
+    def __init__(self, content, images, formatting, annotations):
+        """
+        Initialize a document object.
+
+        Args:
+            content (str): The content of the document.
+            images (list): List of images in the document.
+            formatting (str): The formatting style of the document.
+            annotations (list): List of annotations in the document.
+        """
+        self.content = content
+        self.images = images
+        self.formatting = formatting
+        self.annotations = annotations
+
+    def display(self):
+        """Display the contents of the document."""
+        print("Content:", self.content)
+        print("Images:", self.images)
+        print("Formatting:", self.formatting)
+        print("Annotations:", self.annotations)
+
+def build_templates(count):
+    """Construct `count` template documents the way the registry is populated today."""
+    return {
+        f"template{i}": Document(f"Document {i}", [f"Image{i}.png"], "Basic", [f"Annotation{i}"])
+        for i in range(count)
+    }
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "prototypes.bin")
+
+    # Create a prototype registry and save it to disk
+    registry = MappedPrototypeRegistry()
+    registry.register("basic", Document("Basic Document", [], "Basic", []))
+    registry.register("advanced", Document("Advanced Document", ["Image1.png"], "Advanced", ["Annotation1"]))
+    registry.save(path)
+
+    # Reopen it: nothing is decoded until it is retrieved
+    registry = MappedPrototypeRegistry(path)
+    print(registry.names())  # Output: ['advanced', 'basic']
+    print("\nAdvanced Document:")
+    registry.get("advanced").display()
+    registry.close()
+
+    # Compare cold start and first-get latency as the number of templates grows
+    print()
+    for count in (1000, 10000, 50000):
+        start = time.perf_counter()
+        templates = build_templates(count)
+        eager = MappedPrototypeRegistry()
+        for name, template in templates.items():
+            eager.register(name, template)
+        eager_time = time.perf_counter() - start
+        eager.save(path)
+
+        start = time.perf_counter()
+        lazy = MappedPrototypeRegistry(path)
+        open_time = time.perf_counter() - start
+        start = time.perf_counter()
+        lazy.get(f"template{count // 2}")
+        first_get_time = time.perf_counter() - start
+        lazy.close()
+
+        print(f"{count:6} templates: build {eager_time * 1e3:8.2f} ms, "
+              f"open {open_time * 1e3:6.3f} ms, first get {first_get_time * 1e6:6.1f} us")
+
+    os.remove(path)
+    os.rmdir(directory)
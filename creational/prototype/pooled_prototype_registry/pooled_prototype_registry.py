@@ -0,0 +1,241 @@
+import threading
+import timeit
+import traceback
+from collections import deque
+from copy import deepcopy
+
+def prototype(cls):
+    """
+    Decorator function to add prototype functionality to a class.
+
+    Args:
+        cls: The class to be decorated as a prototype.
+
+    Returns:
+        The decorated class with prototype functionality.
+    """
+    # Add a clone method to the class
+    cls.clone = lambda self: deepcopy(self)
+    return cls
+
+class ClonePool:
+    """
+    Ready-made clones of a single prototype, with hit, miss and refill error counters.
+    """
+
+    def __init__(self, prototype, size):
+        """
+        Initialize the clone pool.
+
+        Args:
+            prototype: The prototype object the pool holds clones of.
+            size (int): The high-water mark the pool is refilled up to.
+        """
+        self.prototype = prototype
+        self.size = size
+        self.clones = deque()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.last_error = None
+        self._refill_lock = threading.Lock()  # Keeps concurrent refills from overfilling the pool
+
+    def refill(self):
+        """Clone the prototype until the pool is back at its high-water mark."""
+        with self._refill_lock:
+            for _ in range(self.size - len(self.clones)):
+                self.clones.append(self.prototype.clone())
+
+class PooledPrototypeRegistry:
+    def __init__(self):
+        """Initialize the prototype registry and start the background refill thread."""
+        self.prototypes = {}
+        self.pools = {}
+        self._refill_needed = threading.Event()
+        self._closed = False
+        self._refill_thread = threading.Thread(target=self._refill_loop, daemon=True)
+        self._refill_thread.start()
+
+    def register(self, name, prototype, pool_size=0):
+        """
+        Register a prototype with a given name.
+
+        Args:
+            name (str): The name of the prototype.
+            prototype: The prototype object to register.
+            pool_size (int): How many ready-made clones to keep for this prototype, 0 disables pooling.
+        """
+        self.prototypes[name] = prototype
+        if pool_size > 0:
+            # Replacing the pool also drops clones of a previously registered prototype
+            self.pools[name] = ClonePool(prototype, pool_size)
+            self._refill_needed.set()
+        else:
+            self.pools.pop(name, None)
+
+    def get(self, name):
+        """
+        Retrieve a prototype by name.
+
+        A pooled prototype is served from its pool when a clone is ready, otherwise it is
+        cloned on the spot.
+
+        Args:
+            name (str): The name of the prototype to retrieve.
+
+        Returns:
+            The cloned instance of the prototype.
+        """
+        pool = self.pools.get(name)
+        if pool is not None:
+            try:
+                clone = pool.clones.popleft()
+            except IndexError:
+                pool.misses += 1
+            else:
+                pool.hits += 1
+                self._refill_needed.set()
+                return clone
+        if name in self.prototypes:
+            return self.prototypes[name].clone()
+        else:
+            raise KeyError(f"Prototype '{name}' not found.")
+
+    def get_many(self, name, n):
+        """
+        Retrieve several clones of a prototype at once.
+
+        The pool is drained first and the remainder is cloned in one batch.
+
+        Args:
+            name (str): The name of the prototype to retrieve.
+            n (int): The number of clones to return.
+
+        Returns:
+            list: The cloned instances of the prototype.
+        """
+        if name not in self.prototypes:
+            raise KeyError(f"Prototype '{name}' not found.")
+        clones = []
+        pool = self.pools.get(name)
+        if pool is not None:
+            popleft = pool.clones.popleft
+            try:
+                while len(clones) < n:
+                    clones.append(popleft())
+            except IndexError:
+                pass
+            pool.hits += len(clones)
+            pool.misses += n - len(clones)
+            self._refill_needed.set()
+        clone = self.prototypes[name].clone
+        clones.extend(clone() for _ in range(n - len(clones)))
+        return clones
+
+    def stats(self, name):
+        """
+        Report the pool counters of a prototype.
+
+        Args:
+            name (str): The name of the pooled prototype.
+
+        Returns:
+            dict: The pool's size, ready clones, hits, misses and failed background refills.
+        """
+        pool = self.pools[name]
+        return {
+            "size": pool.size, "ready": len(pool.clones), "hits": pool.hits, "misses": pool.misses,
+            "errors": pool.errors,
+        }
+
+    def warm(self, name):
+        """
+        Fill the pool of a prototype on the calling thread, e.g. before serving traffic.
+
+        Args:
+            name (str): The name of the pooled prototype.
+        """
+        self.pools[name].refill()
+
+    def close(self):
+        """Stop the background refill thread."""
+        self._closed = True
+        self._refill_needed.set()
+        self._refill_thread.join()
+
+    def _refill_loop(self):
+        """Refill every pool whenever a get has taken clones from one."""
+        while True:
+            self._refill_needed.wait()
+            self._refill_needed.clear()
+            if self._closed:
+                return
+            for pool in list(self.pools.values()):
+                try:
+                    pool.refill()
+                except Exception as error:
+                    # Keep refilling the other pools; a get still clones on the spot after a miss
+                    pool.errors += 1
+                    pool.last_error = error
+                    if pool.errors == 1:
+                        traceback.print_exc()
+
+@prototype
+class Document:
+    def __init__(self, content, images, formatting, annotations):
+        """
+        Initialize a document object.
+
+        Args:
+            content (str): The content of the document.
+            images (list): List of images in the document.
+            formatting (str): The formatting style of the document.
+            annotations (list): List of annotations in the document.
+        """
+        self.content = content
+        self.images = images
+        self.formatting = formatting
+        self.annotations = annotations
+
+    def display(self):
+        """Display the contents of the document."""
+        print("Content:", self.content)
+        print("Images:", self.images)
+        print("Formatting:", self.formatting)
+        print("Annotations:", self.annotations)
+
+if __name__ == "__main__":
+    # Create a prototype registry
+    registry = PooledPrototypeRegistry()
+
+    # Register prototype documents, keeping ready-made clones of the hot one
+    registry.register("basic", Document("Basic Document", [], "Basic", []))
+    registry.register("advanced", Document("Advanced Document", ["Image1.png"], "Advanced", ["Annotation1"]), pool_size=1000)
+
+    # Fill the pool up front instead of waiting for the background thread
+    registry.warm("advanced")
+
+    # Retrieve and display prototype documents
+    advanced_doc = registry.get("advanced")
+    advanced_doc.images.append("Image2.png")
+
+    print("Advanced Document:")
+    advanced_doc.display()
+
+    print("\nFresh Advanced Document:")
+    registry.get("advanced").display()
+
+    # Retrieve a batch of clones, drained from the pool first
+    docs = registry.get_many("advanced", 1500)
+    print("\nBatch size:", len(docs))
+    print("Pool stats:", registry.stats("advanced"))
+
+    # Compare get latency with and without a warm pool
+    registry.warm("advanced")
+    number = 500
+    pooled_time = timeit.timeit(lambda: registry.get("advanced"), number=number)
+    cloned_time = timeit.timeit(lambda: registry.get("basic"), number=number)
+    print(f"\npooled get: {pooled_time / number * 1e6:8.2f} us")
+    print(f"cloned get: {cloned_time / number * 1e6:8.2f} us")
+
+    registry.close()
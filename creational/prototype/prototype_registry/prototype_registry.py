@@ -1,3 +1,9 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import timeit
 from copy import deepcopy
 
 def prototype(cls):
@@ -10,40 +16,196 @@ def prototype(cls):
     Returns:
         The decorated class with prototype functionality.
     """
+    def clone(self, **overrides):
+        """
+        Create and return a clone of the object.
+
+        Overridden fields are set directly on the clone and never copied.
+
+        Args:
+            **overrides: Field values to use in the clone instead of copies of the prototype's.
+
+        Returns:
+            A new instance cloned from the prototype.
+        """
+        if not overrides:
+            return deepcopy(self)
+        state = vars(self)
+        unknown = overrides.keys() - state.keys()
+        if unknown:
+            raise TypeError(f"{type(self).__name__} has no field(s) {', '.join(sorted(unknown))}")
+        new = type(self).__new__(type(self))
+        memo = {}
+        for name, value in state.items():
+            if name not in overrides:
+                setattr(new, name, deepcopy(value, memo))
+        for name, value in overrides.items():
+            setattr(new, name, value)
+        return new
+
     # Add a clone method to the class
-    cls.clone = lambda self: deepcopy(self)
+    cls.clone = clone
     return cls
 
 class PrototypeRegistry:
     def __init__(self):
         """Initialize the prototype registry."""
         self.prototypes = {}
+        self.versions = {}  # Bumped every time a prototype is registered or updated
+        self.subscribers = []
 
     def register(self, name, prototype):
         """
         Register a prototype with a given name.
 
+        Registering a name again replaces its prototype and bumps its version.
+
         Args:
             name (str): The name of the prototype.
             prototype: The prototype object to register.
         """
         self.prototypes[name] = prototype
+        self._bump(name)
+
+    def update(self, name, **fields):
+        """
+        Change fields of a registered prototype in place and bump its version.
+
+        Args:
+            name (str): The name of the prototype to update.
+            **fields: The field values to set on the prototype, which must all be existing fields.
+        """
+        if name not in self.prototypes:
+            raise KeyError(f"Prototype '{name}' not found.")
+        prototype = self.prototypes[name]
+        unknown = fields.keys() - vars(prototype).keys()
+        if unknown:
+            raise TypeError(f"{type(prototype).__name__} has no field(s) {', '.join(sorted(unknown))}")
+        for field, value in fields.items():
+            setattr(prototype, field, value)
+        self._bump(name)
+
+    def version(self, name):
+        """
+        Return the current version of a prototype.
+
+        Caches derived from a prototype can store this number and compare it later
+        instead of re-checking the prototype's contents.
+
+        Args:
+            name (str): The name of the prototype.
+
+        Returns:
+            int: The version, starting at 1 and bumped on every change.
+        """
+        if name in self.versions:
+            return self.versions[name]
+        else:
+            raise KeyError(f"Prototype '{name}' not found.")
+
+    def subscribe(self, callback):
+        """
+        Call `callback(name, version)` whenever a prototype changes.
+
+        Args:
+            callback (callable): The function invalidating whatever depends on the prototype.
+
+        Returns:
+            callable: A function that removes the subscription.
+        """
+        self.subscribers.append(callback)
+        return lambda: self.subscribers.remove(callback)
+
+    def export_stream(self):
+        """
+        Serialise the registered prototypes one line at a time.
+
+        Each line is a compact JSON array of the name and the prototype's fields, so the
+        output can be written to a file as it is produced.
+
+        Yields:
+            str: One newline-terminated line per prototype.
+        """
+        encode = json.JSONEncoder(separators=(",", ":")).encode
+        for name, prototype in self.prototypes.items():
+            yield encode([name, vars(prototype)]) + "\n"
 
-    def get(self, name):
+    def import_stream(self, lines, factory):
+        """
+        Register prototypes from lines written by `export_stream`.
+
+        Each line is registered as soon as it is parsed, so `lines` can be an open file
+        and the whole export never has to be held in memory.
+
+        Args:
+            lines (iterable): The exported lines, e.g. an open file.
+            factory (callable): Builds a prototype from its fields as keyword arguments.
+
+        Returns:
+            int: The number of prototypes registered.
+        """
+        decode = json.JSONDecoder().decode
+        count = 0
+        for line in lines:
+            if line.strip():
+                name, fields = decode(line)
+                self.register(name, factory(**fields))
+                count += 1
+        return count
+
+    def _bump(self, name):
+        """Bump the version of a prototype and notify subscribers."""
+        version = self.versions.get(name, 0) + 1
+        self.versions[name] = version
+        for callback in list(self.subscribers):
+            callback(name, version)
+
+    def get(self, name, **overrides):
         """
         Retrieve a prototype by name.
 
         Args:
             name (str): The name of the prototype to retrieve.
+            **overrides: Field values to use in the clone instead of copies of the prototype's.
 
         Returns:
             The cloned instance of the prototype.
         """
         if name in self.prototypes:
-            return self.prototypes[name].clone()
+            return self.prototypes[name].clone(**overrides)
         else:
             raise KeyError(f"Prototype '{name}' not found.")
 
+    def clone_batch(self, names, interned=()):
+        """
+        Clone several prototypes in one pass.
+
+        The clones share one deepcopy memo, so sub-objects shared between the prototypes
+        are copied once and stay shared between the clones. A name repeated in `names`
+        starts a new memo for each repetition, so every clone is a distinct object.
+
+        Args:
+            names (iterable): The names of the prototypes to clone.
+            interned (iterable): Immutable sub-objects the clones reference instead of copying.
+
+        Returns:
+            list: The cloned instances, in the order of `names`.
+        """
+        interned = {id(obj): obj for obj in interned}
+        memos = []
+        seen = {}
+        clones = []
+        for name in names:
+            if name not in self.prototypes:
+                raise KeyError(f"Prototype '{name}' not found.")
+            # The n-th occurrence of a name is cloned with the n-th memo
+            occurrence = seen.get(name, 0)
+            seen[name] = occurrence + 1
+            if occurrence == len(memos):
+                memos.append(dict(interned))
+            clones.append(deepcopy(self.prototypes[name], memos[occurrence]))
+        return clones
+
 @prototype
 class Document:
     def __init__(self, content, images, formatting, annotations):
@@ -68,6 +230,34 @@ class Document:
         print("Formatting:", self.formatting)
         print("Annotations:", self.annotations)
 
+def benchmark_stream(count=10000):
+    """
+    Stream templates to a file and back into a new registry, printing the throughput.
+
+    Args:
+        count (int): The number of templates to stream.
+    """
+    source = PrototypeRegistry()
+    for i in range(count):
+        source.register(f"template{i}", Document(f"Document {i}", [f"Image{i}.png"], "Basic", [f"Annotation{i}"]))
+
+    path = os.path.join(tempfile.mkdtemp(), "prototypes.jsonl")
+    start = time.perf_counter()
+    with open(path, "w") as file:
+        file.writelines(source.export_stream())
+    export_time = time.perf_counter() - start
+
+    target = PrototypeRegistry()
+    start = time.perf_counter()
+    with open(path) as file:
+        imported = target.import_stream(file, Document)
+    import_time = time.perf_counter() - start
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+
+    print(f"\nexport: {count / export_time:10.0f} templates/sec")
+    print(f"import: {imported / import_time:10.0f} templates/sec")
+
 if __name__ == "__main__":
     # Create a prototype registry
     registry = PrototypeRegistry()
@@ -98,3 +288,63 @@ if __name__ == "__main__":
 
     print("\nOriginal Basic Document:")
     basic_doc.display()
+
+    # Retrieve a clone with its content and images replaced, without copying the replaced fields
+    custom_doc = registry.get("advanced", content="Custom Document", images=["Image3.png"])
+
+    print("\nCustom Advanced Document:")
+    custom_doc.display()
+
+    # Compare clone-then-modify against cloning with overrides
+    registry.register("large", Document("Large Document", [f"Image{i}.png" for i in range(200)], "Basic", ["Annotation1"]))
+
+    def clone_then_modify():
+        doc = registry.get("large")
+        doc.content = "Replaced"
+        doc.images = ["Replaced.png"]
+
+    def clone_with_overrides():
+        registry.get("large", content="Replaced", images=["Replaced.png"])
+
+    number = 10000
+    modify_time = timeit.timeit(clone_then_modify, number=number)
+    override_time = timeit.timeit(clone_with_overrides, number=number)
+    print(f"\nclone then modify:    {number / modify_time:10.0f} docs/sec")
+    print(f"clone with overrides: {number / override_time:10.0f} docs/sec")
+
+    # Clone prototypes that share one image list in a single batch
+    shared_images = [f"Image{i}.png" for i in range(200)]
+    stock_annotations = ("Reviewed", "Approved")
+    registry.register("report", Document("Report", shared_images, "Basic", stock_annotations))
+    registry.register("summary", Document("Summary", shared_images, "Basic", stock_annotations))
+
+    report_doc, summary_doc = registry.clone_batch(["report", "summary"], interned=[stock_annotations])
+    print("\nShared images stay shared:", report_doc.images is summary_doc.images)  # Output: True
+    print("Shared images are copied:", report_doc.images is not shared_images)  # Output: True
+    print("Interned annotations are not copied:", report_doc.annotations is stock_annotations)  # Output: True
+
+    # Compare cloning one by one against batch cloning
+    names = ["report", "summary"] * 50
+    one_by_one_time = timeit.timeit(lambda: [registry.get(name) for name in names], number=100)
+    batch_time = timeit.timeit(lambda: registry.clone_batch(names), number=100)
+    print(f"\none by one: {len(names) * 100 / one_by_one_time:10.0f} docs/sec")
+    print(f"batch:      {len(names) * 100 / batch_time:10.0f} docs/sec")
+
+    # Keep a cache of rendered documents that is invalidated when a template changes
+    rendered = {}
+    unsubscribe = registry.subscribe(lambda name, version: rendered.pop(name, None))
+
+    def render(name):
+        if name not in rendered:
+            doc = registry.get(name)
+            rendered[name] = (registry.version(name), f"<{doc.formatting}>{doc.content}</{doc.formatting}>")
+        return rendered[name]
+
+    print()
+    print(render("basic"))  # Output: (1, '<Basic>Basic Document</Basic>')
+    registry.update("basic", content="Updated Basic Document")
+    print(render("basic"))  # Output: (2, '<Basic>Updated Basic Document</Basic>')
+    unsubscribe()
+
+    # Stream templates to a file and back, pass a count to stream more, e.g. 1000000
+    benchmark_stream(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
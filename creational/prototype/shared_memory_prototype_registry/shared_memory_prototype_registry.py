@@ -0,0 +1,218 @@
+import multiprocessing
+from copy import deepcopy
+from multiprocessing import shared_memory
+
+def prototype(cls):
+    """
+    Decorator function to add prototype functionality to a class.
+
+    Args:
+        cls: The class to be decorated as a prototype.
+
+    Returns:
+        The decorated class with prototype functionality.
+    """
+    # Add a clone method to the class
+    cls.clone = lambda self: deepcopy(self)
+    return cls
+
+class SharedBytes:
+    """
+    Read-only bytes stored in a shared memory segment.
+
+    Copying or pickling a SharedBytes only passes the segment name around, and every
+    process reads the payload through a zero-copy memoryview of the segment.
+    """
+
+    def __init__(self, name, size):
+        """
+        Initialize the SharedBytes.
+
+        Args:
+            name (str): The name of the shared memory segment.
+            size (int): The number of payload bytes in the segment.
+        """
+        self.name = name
+        self.size = size
+        self._segment = None
+
+    @property
+    def view(self):
+        """memoryview: A read-only view of the payload, attaching to the segment on first use."""
+        if self._segment is None:
+            self._segment = shared_memory.SharedMemory(name=self.name)
+        return self._segment.buf[:self.size].toreadonly()
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"SharedBytes({self.name!r}, {self.size} bytes)"
+
+    def __deepcopy__(self, memo):
+        # The payload is immutable, so clones may share the same handle
+        return self
+
+    def __getstate__(self):
+        return {"name": self.name, "size": self.size, "_segment": None}
+
+class SharedMemoryPrototypeRegistry:
+    """
+    Prototype registry that moves large binary fields into shared memory.
+
+    When a prototype is registered, every bytes value at least `threshold` bytes long,
+    directly or inside a list, is copied once into a shared memory segment and replaced
+    by a SharedBytes handle. Clones in forked or spawned workers then refer to the same
+    pages instead of holding their own copy. Call `close` in the owning process to free
+    the segments.
+    """
+
+    def __init__(self, threshold=4096):
+        """
+        Initialize the prototype registry.
+
+        Args:
+            threshold (int): The smallest bytes value that is moved into shared memory.
+        """
+        self.prototypes = {}
+        self.threshold = threshold
+        self._segments = []
+
+    def register(self, name, prototype):
+        """
+        Register a prototype with a given name.
+
+        Args:
+            name (str): The name of the prototype.
+            prototype: The prototype object to register.
+        """
+        for attr, value in vars(prototype).items():
+            if isinstance(value, list):
+                setattr(prototype, attr, [self._share(item) for item in value])
+            else:
+                setattr(prototype, attr, self._share(value))
+        self.prototypes[name] = prototype
+
+    def get(self, name):
+        """
+        Retrieve a prototype by name.
+
+        Args:
+            name (str): The name of the prototype to retrieve.
+
+        Returns:
+            The cloned instance of the prototype.
+        """
+        if name in self.prototypes:
+            return self.prototypes[name].clone()
+        else:
+            raise KeyError(f"Prototype '{name}' not found.")
+
+    def close(self):
+        """Release every shared memory segment created by this registry."""
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments.clear()
+
+    def _share(self, value):
+        """Move a large bytes value into a shared memory segment."""
+        if not isinstance(value, (bytes, bytearray)) or len(value) < self.threshold:
+            return value
+        segment = shared_memory.SharedMemory(create=True, size=len(value))
+        segment.buf[:len(value)] = value
+        self._segments.append(segment)
+        return SharedBytes(segment.name, len(value))
+
+@prototype
+class Document:
+    def __init__(self, content, images, formatting, annotations):
+        """
+        Initialize a document object.
+
+        Args:
+            content (str): The content of the document.
+            images (list): List of images in the document.
+            formatting (str): The formatting style of the document.
+            annotations (list): List of annotations in the document.
+        """
+        self.content = content
+        self.images = images
+        self.formatting = formatting
+        self.annotations = annotations
+
+    def display(self):
+        """Display the contents of the document."""
+        print("Content:", self.content)
+        print("Images:", self.images)
+        print("Formatting:", self.formatting)
+        print("Annotations:", self.annotations)
+
+def private_rss():
+    """
+    Read the resident memory private to this process, which is what each worker adds.
+
+    Returns:
+        int: Private resident memory in kilobytes (Linux only).
+    """
+    total = 0
+    with open("/proc/self/smaps_rollup") as smaps:
+        for line in smaps:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1])
+    return total
+
+def worker(template, results):
+    """
+    Clone a template as a worker would, read every image page and report private RSS.
+
+    Args:
+        template: The prototype handed to the worker.
+        results: A queue receiving the worker's private RSS in kilobytes.
+    """
+    doc = template.clone()
+    for image in doc.images:
+        payload = image.view if isinstance(image, SharedBytes) else memoryview(image)
+        sum(payload[::4096])
+    results.put(private_rss())
+
+def measure(template, workers=4):
+    """
+    Hand a template to freshly spawned worker processes.
+
+    Args:
+        template: The prototype handed to the workers.
+        workers (int): The number of worker processes.
+
+    Returns:
+        float: The average private RSS of the workers, in megabytes.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(template, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    sizes = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return sum(sizes) / len(sizes) / 1024
+
+if __name__ == "__main__":
+    # Create a prototype registry
+    registry = SharedMemoryPrototypeRegistry()
+    images = [bytes([i]) * (16 * 1024 * 1024) for i in range(4)]
+
+    # Register a prototype with 64 MB of images, which move into shared memory
+    registry.register("photo", Document("Photo Album", list(images), "Basic", ["Annotation1"]))
+    photo_doc = registry.get("photo")
+    print("Photo Document:")
+    photo_doc.display()
+    print(photo_doc.images[1].view[0])  # Output: 1
+
+    # Compare worker RSS when the images are pickled to each worker and when they are shared
+    pickled_rss = measure(Document("Photo Album", list(images), "Basic", ["Annotation1"]))
+    shared_rss = measure(registry.prototypes["photo"])
+    print(f"\npickled images: {pickled_rss:8.1f} MB private RSS per worker")
+    print(f"shared images:  {shared_rss:8.1f} MB private RSS per worker")
+
+    registry.close()
@@ -0,0 +1,212 @@
+import timeit
+import tracemalloc
+from abc import ABC, abstractmethod
+from copy import deepcopy
+from functools import lru_cache
+
+class Prototype(ABC):
+    """
+    Abstract base class defining the interface for cloning.
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    def clone(self):
+        """
+        Create and return a clone of the object.
+
+        Returns:
+            Prototype: A new instance cloned from the prototype.
+        """
+        pass
+
+def prototype(cls):
+    """
+    Decorator function to add prototype functionality to a class.
+
+    Args:
+        cls: The class to be decorated as a prototype.
+
+    Returns:
+        The decorated class with prototype functionality.
+    """
+    # Add a clone method to the class
+    cls.clone = lambda self: deepcopy(self)
+    return cls
+
+@lru_cache(maxsize=None)
+def slot_names(cls):
+    """
+    List the attribute names of every slot a class and its bases declare.
+
+    Args:
+        cls: The class to inspect.
+
+    Returns:
+        tuple: The slot names, with private names mangled as Python stores them.
+    """
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name in ("__dict__", "__weakref__"):
+                continue
+            if name.startswith("__") and not name.endswith("__"):
+                name = f"_{klass.__name__.lstrip('_')}{name}"
+            names.append(name)
+    return tuple(names)
+
+class PrototypeRegistry:
+    def __init__(self):
+        """Initialize the prototype registry."""
+        self.prototypes = {}
+
+    def register(self, name, prototype):
+        """
+        Register a prototype with a given name.
+
+        Args:
+            name (str): The name of the prototype.
+            prototype: The prototype object to register.
+        """
+        self.prototypes[name] = prototype
+
+    def get(self, name):
+        """
+        Retrieve a prototype by name.
+
+        Args:
+            name (str): The name of the prototype to retrieve.
+
+        Returns:
+            The cloned instance of the prototype.
+        """
+        if name in self.prototypes:
+            return self.prototypes[name].clone()
+        else:
+            raise KeyError(f"Prototype '{name}' not found.")
+
+class Document(Prototype):
+    """
+    Compact document without a per-instance __dict__.
+
+    Images and annotations are stored as tuples, so clones share them instead of copying
+    them. Mutating a clone replaces the tuple, e.g. `doc.images += ("Image2.png",)`,
+    which copies only the field being changed.
+    """
+
+    __slots__ = ("content", "images", "formatting", "annotations")
+
+    def __init__(self, content, images, formatting, annotations):
+        """
+        Initialize the Document object.
+
+        Args:
+            content (str): The content of the document.
+            images (iterable): The images in the document.
+            formatting (str): The formatting style of the document.
+            annotations (iterable): The annotations in the document.
+        """
+        self.content = content
+        # tuple() returns a tuple argument unchanged, so clones share it for free
+        self.images = tuple(images)
+        self.formatting = formatting
+        self.annotations = tuple(annotations)
+
+    def clone(self):
+        """
+        Create and return a clone of the document.
+
+        Subclasses are cloned into their own type with every slot, and any `__dict__`,
+        shared with the prototype.
+
+        Returns:
+            Document: A new instance cloned from the prototype.
+        """
+        cls = type(self)
+        if cls is Document:
+            return Document(self.content, self.images, self.formatting, self.annotations)
+        new = cls.__new__(cls)
+        for name in slot_names(cls):
+            try:
+                value = getattr(self, name)
+            except AttributeError:
+                continue  # Leave slots that were never set unset in the clone as well
+            object.__setattr__(new, name, value)
+        state = getattr(self, "__dict__", None)
+        if state:
+            new.__dict__.update(state)
+        return new
+
+    def display(self):
+        """
+        Display the contents of the document.
+        """
+        print("Content:", self.content)
+        print("Images:", list(self.images))
+        print("Formatting:", self.formatting)
+        print("Annotations:", list(self.annotations))
+
+@prototype
+class DecoratedDocument(Document):
+    """The compact document cloned by the @prototype decorator."""
+
+    __slots__ = ()
+
+@prototype
+class DictDocument:
+    """The document as the decorator_prototype example defines it, for comparison."""
+
+    def __init__(self, content, images, formatting, annotations):
+        self.content = content
+        self.images = images
+        self.formatting = formatting
+        self.annotations = annotations
+
+def bytes_per_instance(make, count=100000):
+    """
+    Measure the memory allocated per instance, including its containers.
+
+    Args:
+        make (callable): Creates one instance.
+        count (int): The number of instances to keep alive while measuring.
+
+    Returns:
+        float: The average number of bytes allocated per instance.
+    """
+    tracemalloc.start()
+    instances = [make() for _ in range(count)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del instances
+    return allocated / count
+
+if __name__ == "__main__":
+    # Create a prototype registry of compact documents
+    registry = PrototypeRegistry()
+    registry.register("basic", Document("Basic Document", [], "Basic", []))
+    registry.register("advanced", DecoratedDocument("Advanced Document", ["Image1.png"], "Advanced", ["Annotation1"]))
+
+    # Clone a document and modify the clone
+    advanced_doc = registry.get("advanced")
+    cloned_doc = advanced_doc.clone()
+    cloned_doc.images += ("Image2.png",)
+    cloned_doc.content = "Cloned Advanced Document"
+
+    print("Advanced Document:")
+    advanced_doc.display()
+    print("\nCloned Advanced Document:")
+    cloned_doc.display()
+
+    # Compare memory and clone throughput with the __dict__-based document
+    images = [f"Image{i}.png" for i in range(5)]
+    annotations = [f"Annotation{i}" for i in range(5)]
+    number = 100000
+    print()
+    for doc in (DictDocument("Benchmark", images, "Basic", annotations),
+                DecoratedDocument("Benchmark", images, "Basic", annotations),
+                Document("Benchmark", images, "Basic", annotations)):
+        size = bytes_per_instance(doc.clone)
+        elapsed = timeit.timeit(doc.clone, number=number)
+        print(f"{type(doc).__name__:17} {size:6.0f} bytes/clone {number / elapsed:12.0f} clones/sec")
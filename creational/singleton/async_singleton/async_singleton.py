@@ -0,0 +1,137 @@
+import asyncio
+import time
+
+def async_singleton(cls):
+    """
+    Decorator function to implement the Singleton pattern for a class with async setup.
+
+    The decorated class gets an `async_init` coroutine method that finishes setting up
+    the instance. `await Cls.get_instance()` constructs the instance and awaits its
+    initializer on the first call. Concurrent callers await the same pending future
+    instead of running the initializer again, and nothing blocks the event loop. If the
+    initializer fails, every waiting caller receives the error and the next call tries
+    again. The instance belongs to the event loop it was created on.
+
+    Args:
+        cls: The class to be decorated as a Singleton. It must define `async def async_init(self)`.
+
+    Returns:
+        The decorated class with a `get_instance` coroutine class method.
+    """
+    state = {"instance": None, "pending": None}  # The ready instance, or the future of one being set up
+
+    async def initialize(args, kwargs):
+        instance = cls(*args, **kwargs)
+        await instance.async_init()
+        return instance
+
+    async def get_instance(klass, *args, **kwargs):
+        """
+        Return the single instance, running the async initializer on first use.
+
+        Args:
+            *args: Positional arguments for class initialization, used on the first call only.
+            **kwargs: Keyword arguments for class initialization, used on the first call only.
+
+        Returns:
+            The single, initialised instance of the decorated class.
+        """
+        instance = state["instance"]
+        if instance is not None:
+            return instance  # Fast path: no await once the instance is ready
+        pending = state["pending"]
+        if pending is None:
+            # First caller: start the initializer as a task that every caller can await
+            pending = state["pending"] = asyncio.ensure_future(initialize(args, kwargs))
+            pending.add_done_callback(finish)
+        # Shield it so that a cancelled caller does not cancel the setup for everyone else
+        return await asyncio.shield(pending)
+
+    def finish(pending):
+        """Publish the instance, or forget a failed setup so that the next call retries."""
+        state["pending"] = None
+        if not pending.cancelled() and pending.exception() is None:
+            state["instance"] = pending.result()
+
+    def reset():
+        """Forget the instance, e.g. between tests."""
+        state["instance"] = None
+
+    cls.get_instance = classmethod(get_instance)
+    cls.reset_instance = staticmethod(reset)
+    return cls
+
+
+@async_singleton
+class ConnectionPool:
+    """
+    Class implementing the Singleton pattern for a resource with async setup.
+    """
+    attempts = 0  # Number of times async_init has run
+    fail_first = False  # Make the first setup fail, to demonstrate retries
+
+    def __init__(self, size=4):
+        """
+        Initialize the ConnectionPool instance.
+
+        Args:
+            size (int): The number of connections to open.
+        """
+        self.size = size
+        self.connections = []
+
+    async def async_init(self):
+        """Open the connections without blocking the event loop."""
+        ConnectionPool.attempts += 1
+        await asyncio.sleep(0.1)
+        if ConnectionPool.fail_first and ConnectionPool.attempts == 1:
+            raise ConnectionError("setup failed")
+        self.connections = [f"connection{i}" for i in range(self.size)]
+
+    def get_data(self) -> str:
+        """
+        Get a description of the pool.
+
+        Returns:
+            The number of open connections.
+        """
+        return f"{len(self.connections)} connections"
+
+
+if __name__ == "__main__":
+    async def main():
+        # Hundreds of concurrent tasks share one setup
+        pools = await asyncio.gather(*(ConnectionPool.get_instance() for _ in range(500)))
+        print(all(pool is pools[0] for pool in pools))  # Output: True
+        print(ConnectionPool.attempts, pools[0].get_data())  # Output: 1 4 connections
+
+        # A failed setup is reported to every waiter and retried on the next call
+        ConnectionPool.reset_instance()
+        ConnectionPool.attempts = 0
+        ConnectionPool.fail_first = True
+        results = await asyncio.gather(*(ConnectionPool.get_instance() for _ in range(200)), return_exceptions=True)
+        print(sum(isinstance(result, ConnectionError) for result in results))  # Output: 200
+        pool = await ConnectionPool.get_instance()
+        print(ConnectionPool.attempts, pool.get_data())  # Output: 2 4 connections
+
+        # Latency once the instance is ready
+        number = 100000
+        start = time.perf_counter()
+        for _ in range(number):
+            await ConnectionPool.get_instance()
+        elapsed = time.perf_counter() - start
+        print(f"\nget_instance: {elapsed / number * 1e9:.0f} ns per await once initialised")
+
+        # Latency of concurrent first calls while the setup is pending
+        ConnectionPool.reset_instance()
+        ConnectionPool.fail_first = False
+
+        async def timed():
+            start = time.perf_counter()
+            await ConnectionPool.get_instance()
+            return time.perf_counter() - start
+
+        latencies = sorted(await asyncio.gather(*(timed() for _ in range(500))))
+        print(f"first calls: p50 {latencies[250] * 1e3:.1f} ms, max {latencies[-1] * 1e3:.1f} ms (setup takes 100 ms)")
+
+    asyncio.run(main())
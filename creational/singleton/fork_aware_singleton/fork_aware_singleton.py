@@ -0,0 +1,221 @@
+import gc
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+
+def fork_unsafe(method):
+    """
+    Mark a method that (re)creates a resource which must not be shared across fork.
+
+    The singleton's constructor is expected to call the method itself; after a fork it
+    is called again on the child's copy of the instance, e.g. to reopen a socket or a
+    file handle.
+
+    Args:
+        method: The method creating the fork-unsafe resource.
+
+    Returns:
+        The same method, marked as fork-unsafe.
+    """
+    method.fork_unsafe = True
+    return method
+
+# Every live registry, visited by the single at-fork hook below
+registries = weakref.WeakSet()
+
+def after_fork_in_child():
+    """Let every live registry recover in a forked child."""
+    for live_registry in list(registries):
+        live_registry.after_fork_in_child()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=after_fork_in_child)
+
+class SingletonRegistry:
+    """
+    Registry of the singletons of a pre-fork process.
+
+    Warming the registry in the parent constructs every registered singleton before the
+    workers are forked, so the children inherit the warmed instances and share their
+    memory pages copy-on-write instead of repeating the warm-up. In each child the
+    registry replaces the construction locks, which may have been held by a parent
+    thread at fork time, and calls the `@fork_unsafe` methods of every instance.
+    """
+
+    def __init__(self):
+        """Initialize the singleton registry."""
+        self.classes = []  # Classes in registration order
+        self.instances = {}
+        self.locks = {}
+        self.factory_args = {}  # Maps a class to the (args, kwargs) warm_up constructs it with
+        registries.add(self)
+
+    def singleton(self, cls=None, *, args=(), kwargs=None):
+        """
+        Decorator function to implement the Singleton pattern for a class in this registry.
+
+        Can be used bare, `@registry.singleton`, or with the arguments `warm_up` constructs
+        the instance with, `@registry.singleton(args=("models/",))`.
+
+        Args:
+            cls: The class to be decorated as a Singleton.
+            args (tuple): Positional arguments `warm_up` passes to the class.
+            kwargs (dict): Keyword arguments `warm_up` passes to the class.
+
+        Returns:
+            The closure `get_instance` which manages the instantiation of the class as a singleton.
+        """
+        if cls is None:
+            return lambda cls: self.singleton(cls, args=args, kwargs=kwargs)
+        self.classes.append(cls)
+        self.locks[cls] = threading.Lock()
+        self.factory_args[cls] = (tuple(args), dict(kwargs or {}))
+        instances = self.instances
+
+        def get_instance(*args, **kwargs):
+            """
+            Closure to instantiate the decorated class as a singleton with thread-safe locking.
+
+            Args:
+                *args: Positional arguments for class initialization.
+                **kwargs: Keyword arguments for class initialization.
+
+            Returns:
+                The single instance of the decorated class.
+            """
+            try:
+                return instances[cls]
+            except KeyError:
+                pass
+            with self.locks[cls]:  # Looked up on every miss, so a child uses its fresh lock
+                if cls not in instances:
+                    instances[cls] = cls(*args, **kwargs)
+            return instances[cls]
+
+        get_instance.cls = cls
+        return get_instance
+
+    def warm_up(self, freeze=True):
+        """
+        Construct every registered singleton, typically in the parent right before forking.
+
+        Each class is constructed with the arguments it was registered with, see `singleton`.
+
+        Args:
+            freeze (bool): Move everything allocated so far out of the garbage collector's
+                reach with gc.freeze, so collections in the children do not write to, and
+                thereby copy, the shared pages.
+        """
+        for cls in self.classes:
+            if cls not in self.instances:
+                with self.locks[cls]:
+                    if cls not in self.instances:
+                        args, kwargs = self.factory_args[cls]
+                        self.instances[cls] = cls(*args, **kwargs)
+        if freeze:
+            gc.freeze()
+
+    def after_fork_in_child(self):
+        """Replace the construction locks and recreate the fork-unsafe resources of every instance."""
+        for cls in self.locks:
+            self.locks[cls] = threading.Lock()
+        for cls, instance in list(self.instances.items()):
+            for name in dir(cls):
+                method = getattr(cls, name, None)
+                if getattr(method, "fork_unsafe", False):
+                    method(instance)
+
+registry = SingletonRegistry()
+singleton = registry.singleton
+
+
+@singleton
+class ModelCache:
+    """
+    Class implementing a singleton with an expensive warm-up and a per-process connection.
+    """
+
+    def __init__(self):
+        """Load the model and open the connection."""
+        time.sleep(0.5)  # Simulate an expensive warm-up
+        self.model = bytes(range(256)) * (256 * 1024)  # 64 MB of read-only data
+        self.connect()
+
+    @fork_unsafe
+    def connect(self):
+        """Open a connection that belongs to the current process."""
+        self.connection = f"connection of process {os.getpid()}"
+
+    def get_data(self) -> str:
+        """
+        Get a description of the cache.
+
+        Returns:
+            The model size and the connection.
+        """
+        return f"{len(self.model) // 2 ** 20} MB model, {self.connection}"
+
+
+def private_rss():
+    """
+    Read the resident memory private to this process, which is what each worker adds.
+
+    Returns:
+        int: Private resident memory in kilobytes (Linux only).
+    """
+    total = 0
+    with open("/proc/self/smaps_rollup") as smaps:
+        for line in smaps:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1])
+    return total
+
+def worker(started, results):
+    """
+    Handle a first request in a forked worker and report startup time and private RSS.
+
+    Args:
+        started (float): The time.perf_counter() value when the worker was forked.
+        results: A queue receiving (startup seconds, private RSS in kilobytes, connection).
+    """
+    cache = ModelCache()
+    cache.model[::4096]  # Read the whole model, as serving requests would
+    results.put((time.perf_counter() - started, private_rss(), cache.connection))
+
+def run_workers(workers=4):
+    """
+    Fork workers and collect their startup time, private RSS and connection.
+
+    Args:
+        workers (int): The number of worker processes.
+
+    Returns:
+        list: One (startup seconds, private RSS in kilobytes, connection) tuple per worker.
+    """
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(time.perf_counter(), results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return collected
+
+
+if __name__ == "__main__":
+    # Without warm-up, every worker repeats the expensive construction
+    cold = run_workers()
+
+    # Warm up in the parent, then fork: workers inherit the instance copy-on-write
+    registry.warm_up()
+    print(ModelCache().get_data())
+    warm = run_workers()
+
+    for label, results in (("cold workers", cold), ("warm workers", warm)):
+        startup = max(result[0] for result in results)
+        rss = sum(result[1] for result in results) / len(results) / 1024
+        print(f"{label}: startup {startup * 1e3:7.1f} ms, {rss:6.1f} MB private RSS per worker")
+    print(warm[0][2] != ModelCache().connection)  # Output: True, each child reconnected
@@ -1,13 +1,54 @@
+import asyncio
+import contextvars
+import importlib.util
+import os
+import threading
+import time
+import timeit
+
 class SingletonMeta(type):
     """
-    Metaclass to implement the Singleton pattern.
+    Thread-safe metaclass to implement the Singleton pattern.
+
+    A class can choose the scope its instance is shared in with a class keyword:
+    `class Config(metaclass=SingletonMeta, scope="thread")`. The scope is "process"
+    (one instance for everyone, the default), "thread" (one instance per thread, kept
+    in a threading.local) or "context" (one instance per contextvars context, e.g. per
+    asyncio task that sets it). Subclasses inherit the scope but get their own instance.
     """
     _instances = {}  # Dictionary to store instances of classes using this metaclass
+    _locks = {}  # One construction lock per class, so a slow class never blocks the others
+
+    def __new__(mcs, name, bases, namespace, scope=None, **kwargs):
+        # Other class keywords are passed on, e.g. to __init_subclass__
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+    def __init__(cls, name, bases, namespace, scope=None, **kwargs):
+        """
+        Set up the storage for the class's scope.
+
+        Args:
+            scope (str): "process", "thread" or "context", inherited from the base class if omitted.
+            **kwargs: Other class keywords, passed on to type.
+        """
+        super().__init__(name, bases, namespace, **kwargs)
+        scope = scope or getattr(cls, "_scope", "process")
+        if scope not in ("process", "thread", "context"):
+            raise ValueError(f"Unknown singleton scope '{scope}'")
+        cls._scope = scope
+        # Every class gets its own storage, so a subclass never sees its base's instance
+        cls._local = threading.local()
+        cls._context = contextvars.ContextVar(f"{cls.__qualname__}_instance", default=None)
 
     def __call__(cls, *args, **kwargs):
         """
         Override the call method to intercept class instantiation.
 
+        Once the instance exists, it is returned after a single dictionary lookup and
+        without taking a lock. The first calls race for the class's own lock, and only
+        the winner constructs the instance. Thread and context scoped instances are
+        private to their scope, so they are constructed without a lock.
+
         Args:
             cls: The class being instantiated.
             *args: Positional arguments for class initialization.
@@ -16,11 +57,36 @@ class SingletonMeta(type):
         Returns:
             The existing instance if it exists, otherwise creates a new instance and returns it.
         """
-        if cls not in cls._instances:
-            # If the class instance does not exist in _instances dictionary, create a new instance
-            cls._instances[cls] = super().__call__(*args, **kwargs)
+        # Branch on the scope first, so scoped lookups do not pay for a process lookup that always misses
+        scope = cls._scope
+        if scope == "process":
+            instance = cls._instances.get(cls)
+            if instance is not None:
+                return instance  # Fast path: no lock once the instance exists
+        elif scope == "thread":
+            try:
+                return cls._local.instance
+            except AttributeError:
+                instance = cls._local.instance = super().__call__(*args, **kwargs)
+                return instance
+        else:
+            instance = cls._context.get()
+            if instance is None:
+                instance = super().__call__(*args, **kwargs)
+                cls._context.set(instance)
+            return instance
+        # dict.setdefault is atomic, so every thread gets the same lock for this class
+        with cls._locks.setdefault(cls, threading.Lock()):
+            if cls not in cls._instances:  # Double check: another thread may have won the race
+                # If the class instance does not exist in _instances dictionary, create a new instance
+                cls._instances[cls] = super().__call__(*args, **kwargs)
         return cls._instances[cls]
 
+if hasattr(os, "register_at_fork"):
+    # A parent thread may have held a construction lock at fork time, so the child starts
+    # without locks and creates fresh ones on demand
+    os.register_at_fork(after_in_child=SingletonMeta._locks.clear)
+
 
 class Singleton(metaclass=SingletonMeta):
     """
@@ -53,6 +119,41 @@ class Singleton(metaclass=SingletonMeta):
         """
         return self.data
 
+def load_example(name):
+    """
+    Load a sibling singleton example for comparison.
+
+    Args:
+        name (str): The example's directory and module name, e.g. "classic_singleton".
+
+    Returns:
+        The loaded module.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", name, f"{name}.py")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def run_threads(target, threads=8):
+    """
+    Run a function on several threads at once.
+
+    Args:
+        target (callable): The function each thread runs.
+        threads (int): The number of threads.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+    workers = [threading.Thread(target=target) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start
+
 if __name__ == "__main__":
     # Creating an instance of the Classic Singleton
     singleton1 = Singleton()
@@ -70,3 +171,66 @@ if __name__ == "__main__":
     singleton2.set_data("Data 2")
     print(singleton1.get_data())  # Output: 'Data 2'
     print(singleton2.get_data())  # Output: 'Data 2'
+
+    # Construction is race-free: a slow __init__ still runs exactly once
+    constructions = []
+
+    class SlowSingleton(metaclass=SingletonMeta):
+        def __init__(self):
+            constructions.append(threading.get_ident())
+            time.sleep(0.2)
+
+    class OtherSingleton(metaclass=SingletonMeta):
+        pass
+
+    slow_thread = threading.Thread(target=SlowSingleton)
+    slow_thread.start()
+    start = time.perf_counter()
+    OtherSingleton()  # Does not wait for SlowSingleton's construction
+    other_time = time.perf_counter() - start
+    run_threads(SlowSingleton)
+    slow_thread.join()
+    print(f"\nSlowSingleton constructed {len(constructions)} time(s)")  # Output: 1
+    print(f"OtherSingleton constructed in {other_time * 1e3:.2f} ms")
+
+    # Compare access throughput under contention once the instance exists
+    classic = load_example("classic_singleton").Singleton
+    thread_safe = load_example("thread_safe_singleton").Singleton
+    accesses = 100000
+
+    print()
+    for label, factory in (("classic_singleton", classic), ("thread_safe_singleton", thread_safe),
+                           ("metaclass_singleton", Singleton)):
+        factory()
+        elapsed = run_threads(lambda: timeit.timeit(factory, number=accesses))
+        print(f"{label:21} {8 * accesses / elapsed:12.0f} accesses/sec across 8 threads")
+
+    # Scoped singletons: one instance per thread or per asyncio task, no shared writers
+    class ThreadConfig(metaclass=SingletonMeta, scope="thread"):
+        def __init__(self):
+            self.data = threading.current_thread().name
+
+    class RequestContext(metaclass=SingletonMeta, scope="context"):
+        def __init__(self):
+            self.data = None
+
+    seen = []
+    run_threads(lambda: seen.append(ThreadConfig() is ThreadConfig()), threads=4)
+    print(f"\n{seen}, {ThreadConfig().data}")  # Output: [True, True, True, True], MainThread
+
+    async def handle(request):
+        RequestContext().data = request  # Each task gets its own instance
+        await asyncio.sleep(0.01)
+        return RequestContext().data
+
+    async def serve():
+        return await asyncio.gather(*(handle(f"request {i}") for i in range(3)))
+
+    print(asyncio.run(serve()))  # Output: ['request 0', 'request 1', 'request 2']
+
+    # Compare scoped lookups with the process-wide fast path
+    ThreadConfig()
+    RequestContext()
+    for label, factory in (("process", Singleton), ("thread", ThreadConfig), ("context", RequestContext)):
+        elapsed = timeit.timeit(factory, number=accesses)
+        print(f"{label:7} scope: {elapsed / accesses * 1e9:5.0f} ns per lookup")
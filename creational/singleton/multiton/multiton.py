@@ -0,0 +1,169 @@
+import gc
+import inspect
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+def multiton(cls=None, *, maxsize=None, weak=False, key=None):
+    """
+    Decorator function to implement the Multiton pattern for a class.
+
+    Instead of one instance per class, the decorated class gets one shared instance per
+    key. By default the key is made from the constructor arguments after binding them to
+    the signature, so `Client("a")` and `Client(tenant="a")` share an instance.
+
+    At most `maxsize` instances are kept, evicting the least recently used. With
+    `weak=True` instances are also tracked through weak references, so an evicted
+    instance that is still in use keeps being shared, and one nobody holds can be
+    garbage collected. Construction takes a lock for its key only.
+
+    Args:
+        cls: The class to be decorated as a Multiton.
+        maxsize (int): The largest number of instances kept alive, or None for no limit.
+        weak (bool): Whether instances beyond maxsize are shared while someone holds them.
+        key (callable): Optional function building the key from the constructor arguments.
+
+    Returns:
+        The closure `get_instance` which manages the instantiation of the class per key.
+    """
+    if cls is None:
+        return lambda cls: multiton(cls, maxsize=maxsize, weak=weak, key=key)
+
+    signature = inspect.signature(cls)
+    instances = OrderedDict()  # Strong references, least recently used first
+    weak_instances = weakref.WeakValueDictionary() if weak else None
+    locks = {}  # One construction lock per key being constructed
+
+    def make_key(args, kwargs):
+        """Normalise constructor arguments into a hashable key."""
+        if key is not None:
+            return key(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return tuple(
+            (name, tuple(sorted(value.items())) if isinstance(value, dict) else value)
+            for name, value in bound.arguments.items()
+        )
+
+    def lookup(instance_key):
+        """Return the shared instance for a key, or None. Every step is a single atomic dict operation."""
+        instance = instances.get(instance_key)
+        if instance is not None:
+            try:
+                instances.move_to_end(instance_key)
+            except KeyError:
+                pass  # Evicted concurrently, the caller still gets the instance
+            return instance
+        if weak_instances is not None:
+            instance = weak_instances.get(instance_key)
+            if instance is not None:
+                keep(instance_key, instance)
+        return instance
+
+    def keep(instance_key, instance):
+        """Hold a strong reference to an instance, evicting the least recently used beyond maxsize."""
+        instances[instance_key] = instance
+        if maxsize is not None:
+            while len(instances) > maxsize:
+                try:
+                    instances.popitem(last=False)
+                except KeyError:
+                    break
+
+    def get_instance(*args, **kwargs):
+        """
+        Closure to instantiate the decorated class once per key.
+
+        Args:
+            *args: Positional arguments for class initialization.
+            **kwargs: Keyword arguments for class initialization.
+
+        Returns:
+            The shared instance of the decorated class for these arguments.
+        """
+        instance_key = make_key(args, kwargs)
+        instance = lookup(instance_key)
+        if instance is not None:
+            return instance
+        # dict.setdefault is atomic, so every thread constructing this key gets the same lock
+        lock = locks.setdefault(instance_key, threading.Lock())
+        with lock:
+            instance = lookup(instance_key)  # Double check to prevent race conditions
+            if instance is None:
+                instance = cls(*args, **kwargs)
+                if weak_instances is not None:
+                    weak_instances[instance_key] = instance
+                keep(instance_key, instance)
+            # A thread arriving after an earlier removal may have installed a new lock, keep it
+            if locks.get(instance_key) is lock:
+                del locks[instance_key]
+        return instance
+
+    def clear():
+        """Forget every shared instance."""
+        instances.clear()
+        if weak_instances is not None:
+            weak_instances.clear()
+
+    get_instance.clear = clear
+    get_instance.instances = instances
+    return get_instance
+
+
+@multiton(maxsize=2, weak=True)
+class TenantClient:
+    """
+    Class implementing a per-tenant client shared through the Multiton pattern.
+    """
+
+    def __init__(self, tenant, region="eu"):
+        """
+        Initialize the client.
+
+        Args:
+            tenant (str): The tenant the client talks to.
+            region (str): The region of the tenant.
+        """
+        self.tenant = tenant
+        self.region = region
+        time.sleep(0.1)  # Simulate an expensive connection setup
+
+    def get_data(self) -> str:
+        """
+        Get a description of the client.
+
+        Returns:
+            The tenant and region of the client.
+        """
+        return f"{self.tenant}@{self.region}"
+
+
+if __name__ == "__main__":
+    # The same normalised arguments share one instance
+    client1 = TenantClient("acme")
+    client2 = TenantClient(tenant="acme", region="eu")
+    print(client1 is client2)  # Output: True
+    print(TenantClient("acme", region="us") is client1)  # Output: False
+
+    # Beyond maxsize the least recently used client is evicted, but stays shared while held
+    TenantClient("globex")
+    print(len(TenantClient.instances))  # Output: 2
+    print(TenantClient("acme") is client1)  # Output: True
+
+    # Once nobody holds an evicted client it can be collected
+    TenantClient("initech")
+    TenantClient("umbrella")
+    del client1, client2
+    gc.collect()
+    print(sorted(key[0][1] for key in TenantClient.instances))  # Output: ['initech', 'umbrella']
+
+    # Concurrent construction is per key: different tenants build in parallel, each only once
+    TenantClient.clear()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=TenantClient, args=(f"tenant{i % 2}",)) for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(f"2 tenants from 40 threads in {time.perf_counter() - start:.2f} seconds")  # About 0.1 seconds
@@ -1,17 +1,46 @@
+import asyncio
+import contextvars
+import os
 import threading
+import weakref
 
-def singleton(cls):
+# The process-scoped get_instance closures, whose locks are replaced in a forked child
+_process_scoped = weakref.WeakSet()
+
+def _reset_locks_after_fork():
+    """Give every process-scoped singleton a fresh lock, as a parent thread may have held it at fork time."""
+    for get_instance in _process_scoped:
+        get_instance.lock = threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_locks_after_fork)
+
+def singleton(cls=None, *, scope="process"):
     """
     Decorator function to implement the Singleton pattern for a class with thread-safe locking.
 
+    The scope decides who shares the instance: "process" (everyone, the default),
+    "thread" (one instance per thread, kept in a threading.local) or "context" (one
+    instance per contextvars context, e.g. per asyncio task that creates it). Scoped
+    instances are private to their scope, so they need no lock.
+
     Args:
         cls: The class to be decorated as a Singleton.
+        scope (str): "process", "thread" or "context".
 
     Returns:
         The closure `get_instance` which manages the instantiation of the class as a singleton.
     """
+    if cls is None:
+        return lambda cls: singleton(cls, scope=scope)
+    if scope == "thread":
+        return thread_scoped(cls)
+    if scope == "context":
+        return context_scoped(cls)
+    if scope != "process":
+        raise ValueError(f"Unknown singleton scope '{scope}'")
+
     instances = {}  # Dictionary to store instances of decorated classes
-    lock = threading.Lock()  # Thread-safe lock for synchronization
 
     def get_instance(*args, **kwargs):
         """
@@ -28,12 +57,60 @@ def singleton(cls):
             The single instance of the decorated class.
         """
         if cls not in instances:
-            with lock:  # Acquire lock for thread-safe access
+            with get_instance.lock:  # Looked up on every miss, so a forked child uses its fresh lock
                 if cls not in instances:  # Double check to prevent race conditions
                     # If the class instance does not exist in instances dictionary, create a new instance
                     instances[cls] = cls(*args, **kwargs)
         return instances[cls]
 
+    get_instance.lock = threading.Lock()  # Thread-safe lock for synchronization
+    _process_scoped.add(get_instance)
+    return get_instance
+
+
+def thread_scoped(cls):
+    """
+    Create the closure returning one instance of a class per thread.
+
+    Args:
+        cls: The class to be decorated as a per-thread Singleton.
+
+    Returns:
+        The closure `get_instance` which manages the instantiation of the class per thread.
+    """
+    local = threading.local()
+
+    def get_instance(*args, **kwargs):
+        """Return the calling thread's instance, creating it on the thread's first call."""
+        try:
+            return local.instance
+        except AttributeError:
+            local.instance = cls(*args, **kwargs)
+            return local.instance
+
+    return get_instance
+
+
+def context_scoped(cls):
+    """
+    Create the closure returning one instance of a class per contextvars context.
+
+    Args:
+        cls: The class to be decorated as a per-context Singleton.
+
+    Returns:
+        The closure `get_instance` which manages the instantiation of the class per context.
+    """
+    current = contextvars.ContextVar(f"{cls.__qualname__}_instance", default=None)
+
+    def get_instance(*args, **kwargs):
+        """Return the current context's instance, creating it on the context's first call."""
+        instance = current.get()
+        if instance is None:
+            instance = cls(*args, **kwargs)
+            current.set(instance)
+        return instance
+
     return get_instance
 
 
@@ -97,3 +174,38 @@ if __name__ == "__main__":
     print(singleton_initial is singleton_end)  # Output: True
     print(singleton_initial.get_data())  # Output: 'Data INF'
     print(singleton_end.get_data())  # Output: 'Data INF'
+
+    # The same experiment with per-thread singletons is deterministic: each thread has its own data
+    @singleton(scope="thread")
+    class ThreadSingleton:
+        def __init__(self):
+            self.data = None
+
+    results = {}
+
+    def set_and_get(i):
+        ThreadSingleton().data = f"Data {i}"
+        results[i] = ThreadSingleton().data
+
+    threads = [threading.Thread(target=set_and_get, args=(i,)) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(results)  # Output: {0: 'Data 0', 1: 'Data 1', 2: 'Data 2', 3: 'Data 3', 4: 'Data 4'} (in any order)
+
+    # Per-context singletons give each asyncio task its own instance
+    @singleton(scope="context")
+    class RequestSingleton:
+        def __init__(self):
+            self.data = None
+
+    async def handle(i):
+        RequestSingleton().data = f"Request {i}"
+        await asyncio.sleep(0.01)
+        return RequestSingleton().data
+
+    async def serve():
+        return await asyncio.gather(*(handle(i) for i in range(3)))
+
+    print(asyncio.run(serve()))  # Output: ['Request 0', 'Request 1', 'Request 2']
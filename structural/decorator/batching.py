@@ -0,0 +1,296 @@
+import asyncio
+import inspect
+import threading
+import time
+import weakref
+from functools import update_wrapper
+
+class Batch:
+    """
+    Items collected for one call of the batch function, with a slot per caller.
+    """
+
+    def __init__(self, loop=None):
+        """Initialize an empty, open batch, collected in `loop` for an async batch function."""
+        self.loop = loop
+        self.items = []
+        self.slots = []  # threading.Event-based slots or asyncio futures, one per item
+        self.closed = False
+        self.timer = None
+
+class Slot:
+    """
+    The result of one item, handed from the thread that runs the batch to its caller.
+    """
+
+    def __init__(self):
+        """Initialize the slot."""
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class Batcher:
+    """
+    Coalesces concurrent single-item calls into calls of a batch function.
+
+    Calling the batcher with one item adds it to the open batch. The batch is sent to the
+    batch function when it holds `max_batch_size` items or `max_wait` seconds after its
+    first item arrived, whichever comes first, and every caller receives the result at
+    its own position. For a regular batch function the batcher is called from threads
+    and blocks until the result is ready; for an async batch function it returns an
+    awaitable, and calls from different event loops go to separate batches. If the batch function raises,
+    every caller in the batch receives the exception.
+    """
+
+    def __init__(self, batch_function, max_batch_size=64, max_wait=0.005):
+        """
+        Initialize the batcher.
+
+        Parameters:
+        batch_function (function): Takes a list of items and returns a list of results in the same order.
+        max_batch_size (int): The largest number of items sent in one call.
+        max_wait (float): How long the first item of a batch waits for others, in seconds.
+        """
+        self.batch_function = batch_function
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.is_async = inspect.iscoroutinefunction(batch_function)
+        self._condition = threading.Condition()
+        self._current = None  # The open batch of a regular batch function
+        self._open_batches = weakref.WeakKeyDictionary()  # Event loop -> its open batch
+        update_wrapper(self, batch_function)
+
+    def __call__(self, item):
+        """
+        Submit one item and return its result.
+
+        Parameters:
+        item: The item to pass to the batch function.
+
+        Returns:
+        The item's result, or an awaitable of it for an async batch function.
+        """
+        if self.is_async:
+            return self._call_async(item)
+        return self._call_threaded(item)
+
+    def _call_threaded(self, item):
+        slot = Slot()
+        with self._condition:
+            batch = self._current
+            leader = batch is None
+            if leader:
+                batch = self._current = Batch()
+            batch.items.append(item)
+            batch.slots.append(slot)
+            dispatch = len(batch.items) >= self.max_batch_size
+            if dispatch:
+                # Full: this caller closes the batch and runs it, waking the waiting leader
+                self._close(batch)
+                self._condition.notify_all()
+            elif leader:
+                deadline = time.monotonic() + self.max_wait
+                while not batch.closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._close(batch)
+                        dispatch = True
+                        break
+                    self._condition.wait(remaining)
+        if dispatch:
+            self._run_threaded(batch)
+        slot.event.wait()
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
+
+    def _close(self, batch):
+        """Stop adding items to a batch."""
+        batch.closed = True
+        if batch.loop is not None:
+            if self._open_batches.get(batch.loop) is batch:
+                del self._open_batches[batch.loop]
+        elif self._current is batch:
+            self._current = None
+
+    def _run_threaded(self, batch):
+        """Call the batch function and hand each caller its result."""
+        try:
+            results = self._checked(batch, self.batch_function(batch.items))
+        except BaseException as error:
+            for slot in batch.slots:
+                slot.error = error
+                slot.event.set()
+            return
+        for slot, result in zip(batch.slots, results):
+            slot.result = result
+            slot.event.set()
+
+    async def _call_async(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._open_batches.get(loop)
+        if batch is None:
+            self._discard_stale_batches()
+            batch = self._open_batches[loop] = Batch(loop)
+            batch.timer = loop.call_later(self.max_wait, self._dispatch_async, batch)
+        batch.items.append(item)
+        batch.slots.append(future)
+        if len(batch.items) >= self.max_batch_size:
+            batch.timer.cancel()
+            self._dispatch_async(batch)
+        return await future
+
+    def _discard_stale_batches(self):
+        """Drop the open batches of closed event loops, whose timers will never fire."""
+        for loop, batch in list(self._open_batches.items()):
+            if loop.is_closed():
+                self._close(batch)
+
+    def _dispatch_async(self, batch):
+        """Close a batch and run it in its own task."""
+        if batch.closed:
+            return
+        self._close(batch)
+        batch.loop.create_task(self._run_async(batch))
+
+    async def _run_async(self, batch):
+        """Await the batch function and resolve each caller's future."""
+        try:
+            results = self._checked(batch, await self.batch_function(batch.items))
+        except BaseException as error:
+            for future in batch.slots:
+                if not future.done():
+                    future.set_exception(error)
+            if not isinstance(error, Exception):
+                raise
+            return
+        for future, result in zip(batch.slots, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _checked(self, batch, results):
+        """Make sure the batch function returned one result per item."""
+        results = list(results)
+        if len(results) != len(batch.items):
+            raise ValueError(
+                f"{self.__name__} returned {len(results)} results for {len(batch.items)} items"
+            )
+        return results
+
+def batched(batch_function=None, *, max_batch_size=64, max_wait=0.005):
+    """
+    A decorator that turns a batch function into a function called once per item.
+
+    Parameters:
+    batch_function (function): Takes a list of items and returns a list of results in the same order.
+    max_batch_size (int): The largest number of items sent in one call.
+    max_wait (float): How long the first item of a batch waits for others, in seconds.
+
+    Returns:
+    Batcher: A callable taking a single item, see `Batcher`.
+    """
+    if batch_function is None:
+        return lambda batch_function: Batcher(batch_function, max_batch_size, max_wait)
+    return Batcher(batch_function, max_batch_size, max_wait)
+
+# Example usage of the @batched decorator: a local store that serves one request at a time,
+# with a fixed cost per request and a small cost per key.
+
+store = {f"key{i}": i for i in range(1000)}
+store_lock = threading.Lock()
+
+def fetch_many(keys):
+    """
+    Look up several keys in the store with one request.
+
+    Parameters:
+    keys (list): The keys to look up.
+
+    Returns:
+    list: The values, in the order of the keys.
+    """
+    with store_lock:
+        time.sleep(0.001 + 0.00001 * len(keys))
+        return [store.get(key) for key in keys]
+
+@batched(max_batch_size=100, max_wait=0.002)
+def fetch(keys):
+    """Look up a key, batched with concurrent lookups."""
+    return fetch_many(keys)
+
+async_store_lock = asyncio.Lock()
+
+async def async_fetch_many(keys):
+    """
+    Look up several keys in the store with one request, without blocking the event loop.
+
+    Parameters:
+    keys (list): The keys to look up.
+
+    Returns:
+    list: The values, in the order of the keys.
+    """
+    async with async_store_lock:
+        await asyncio.sleep(0.001 + 0.00001 * len(keys))
+        return [store.get(key) for key in keys]
+
+@batched(max_batch_size=100, max_wait=0.002)
+async def async_fetch(keys):
+    """Look up a key, batched with concurrent lookups."""
+    return await async_fetch_many(keys)
+
+def run_threads(lookup, threads=50, lookups=20):
+    """
+    Look up keys from many threads at once.
+
+    Returns:
+    float: Lookups per second.
+    """
+    def work(seed):
+        for i in range(lookups):
+            assert lookup(f"key{seed * lookups + i}") == seed * lookups + i
+
+    workers = [threading.Thread(target=work, args=(seed,)) for seed in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return threads * lookups / (time.perf_counter() - start)
+
+async def run_tasks(lookup, tasks=50, lookups=20):
+    """
+    Look up keys from many asyncio tasks at once.
+
+    Returns:
+    float: Lookups per second.
+    """
+    async def work(seed):
+        for i in range(lookups):
+            assert await lookup(f"key{seed * lookups + i}") == seed * lookups + i
+
+    start = time.perf_counter()
+    await asyncio.gather(*(work(seed) for seed in range(tasks)))
+    return tasks * lookups / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    # Single-item calls from threads, dispatched as batches
+    print(fetch("key1"), fetch("key2"))  # Output: 1 2
+
+    # Compare throughput against one store request per lookup
+    unbatched = run_threads(lambda key: fetch_many([key])[0])
+    batched_threads = run_threads(fetch)
+    print(f"\nthreads, unbatched: {unbatched:8.0f} lookups/sec")
+    print(f"threads, batched:   {batched_threads:8.0f} lookups/sec")
+
+    async def main():
+        async def unbatched_lookup(key):
+            return (await async_fetch_many([key]))[0]
+
+        unbatched = await run_tasks(unbatched_lookup)
+        batched_tasks = await run_tasks(async_fetch)
+        print(f"asyncio, unbatched: {unbatched:8.0f} lookups/sec")
+        print(f"asyncio, batched:   {batched_tasks:8.0f} lookups/sec")
+
+    asyncio.run(main())
@@ -1,15 +1,60 @@
+import asyncio
+import inspect
+import os
+import tempfile
+import threading
 import time
+import timeit
+from contextlib import redirect_stdout
+from functools import wraps
 
-def timing(func):
+from metrics import (
+    HistogramSink, PrintSink, QueueLogSink, RingBufferSink, sampler, timing_async_generator, timing_coroutine
+)
+
+def timing(func=None, *, sink=None, sample_every=1, sample_rate=None, allocations=None):
     """
-    A decorator that prints the time a function takes to execute.
+    A decorator that records the time a function takes to execute.
+
+    Durations are measured with the monotonic, high-resolution `time.perf_counter_ns`
+    and handed to a sink. By default they are printed; pass a `RingBufferSink` to keep
+    the hot path free of I/O and report later.
+
+    For functions called very often, time only a sample of the calls with `sample_every`
+    or `sample_rate`. Calls that are not sampled only pay for the sampling decision, and
+    sampled measurements are weighted so that the sink's counts estimate all calls.
 
     Parameters:
     func (function): The function to be decorated.
+    sink: An object with a `record(name, duration_ns, weight=1)` method receiving each
+        measurement, e.g. a `RingBufferSink` or a `HistogramSink` for per-function percentiles.
+    sample_every (int): Time one call out of every sample_every calls.
+    sample_rate (float): Time each call with this probability instead.
+    allocations (AllocationTracker): Also record the function's allocations while the tracker is enabled.
 
     Returns:
     function: The wrapped function with timing functionality.
     """
+    if func is None:
+        return lambda func: timing(
+            func, sink=sink, sample_every=sample_every, sample_rate=sample_rate, allocations=allocations
+        )
+    if allocations is not None:
+        return allocations.wrap(timing(func, sink=sink, sample_every=sample_every, sample_rate=sample_rate),
+                                func.__qualname__)
+
+    record = (sink or PrintSink("Function")).record
+    name = func.__qualname__
+    perf_counter_ns = time.perf_counter_ns
+    skip, weight = sampler(sample_every, sample_rate)
+
+    # Time the whole await of coroutines and the whole iteration of async generators
+    if inspect.iscoroutinefunction(func):
+        return timing_coroutine(func, name, record, skip, weight)
+    if inspect.isasyncgenfunction(func):
+        return timing_async_generator(func, name, record, skip, weight)
+
+    @wraps(func)
     def wrapper(*args, **kwargs):
         """
         Wrapper function that adds timing functionality to the decorated function.
@@ -21,17 +66,36 @@ def timing(func):
         Returns:
         The result of the decorated function.
         """
-        start_time = time.time()  # Record the start time
+        start_time = perf_counter_ns()  # Record the start time
         result = func(*args, **kwargs)  # Call the original function with its arguments
-        end_time = time.time()  # Record the end time
-
-        # Calculate the duration and print it
-        duration = end_time - start_time
-        print(f"Function {func.__name__} took {duration:.4f} seconds to execute")
+        record(name, perf_counter_ns() - start_time)  # Hand the duration to the sink
 
         return result  # Return the result of the original function
 
-    return wrapper  # Return the wrapper function
+    if skip is None:
+        return wrapper  # Return the wrapper function
+
+    @wraps(func)
+    def sampled_wrapper(*args, **kwargs):
+        """
+        Wrapper function that times only the sampled calls of the decorated function.
+
+        Parameters:
+        *args: Variable length argument list for the decorated function.
+        **kwargs: Arbitrary keyword arguments for the decorated function.
+
+        Returns:
+        The result of the decorated function.
+        """
+        if skip():
+            return func(*args, **kwargs)  # Fast path for calls that are not sampled
+        start_time = perf_counter_ns()
+        result = func(*args, **kwargs)
+        record(name, perf_counter_ns() - start_time, weight)
+
+        return result
+
+    return sampled_wrapper  # Return the sampling wrapper function
 
 # Example usage of the @timing decorator
 
@@ -49,7 +113,94 @@ def example_function(n):
     time.sleep(n)
     return "Function completed"
 
+@timing
+async def example_coroutine(n):
+    """
+    A sample coroutine that waits for n seconds without blocking the event loop.
+
+    Parameters:
+    n (float): The number of seconds to wait.
+
+    Returns:
+    str: A message indicating the coroutine has completed.
+    """
+    await asyncio.sleep(n)
+    return "Coroutine completed"
+
+def noop(x):
+    """A trivial function used to measure the decorator's own overhead."""
+    return x
+
 if __name__ == "__main__":
     # Calling the decorated function
     result = example_function(2)
     print(result)
+
+    # The whole await of a decorated coroutine is timed
+    print(asyncio.run(example_coroutine(0.5)))
+
+    # Measure the per-call overhead of each sink against an undecorated call
+    buffer = RingBufferSink()
+    buffered_noop = timing(noop, sink=buffer)
+    printed_noop = timing(noop)
+
+    number = 200000
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        printed_time = timeit.timeit(lambda: printed_noop(1), number=number)
+    plain_time = timeit.timeit(lambda: noop(1), number=number)
+    buffered_time = timeit.timeit(lambda: buffered_noop(1), number=number)
+
+    print(f"\nundecorated:      {plain_time / number * 1e9:8.0f} ns/call")
+    print(f"ring buffer sink: {buffered_time / number * 1e9:8.0f} ns/call")
+    print(f"print sink:       {printed_time / number * 1e9:8.0f} ns/call (to /dev/null)")
+
+    # Report from the buffer, away from the timed calls
+    buffer.report()
+
+    # Collect per-function latency histograms from several threads
+    histograms = HistogramSink()
+    measured_noop = timing(noop, sink=histograms)
+    measured_sleep = timing(time.sleep, sink=histograms)
+
+    def work():
+        for i in range(10000):
+            measured_noop(i)
+        for _ in range(10):
+            measured_sleep(0.001)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print()
+    for name, entry in histograms.snapshot().items():
+        p50, p99, p999 = (entry["quantiles"][q] / 1e3 for q in (0.5, 0.99, 0.999))
+        print(f"{name}: {entry['count']} calls, p50 {p50:.2f} us, p99 {p99:.2f} us, p999 {p999:.2f} us")
+
+    # Export the same histograms in the Prometheus text format
+    print()
+    histograms.export_prometheus()
+
+    # Measure the per-call overhead at several sampling rates
+    print()
+    for label, options in (("every call", {}), ("1 in 10", {"sample_every": 10}),
+                           ("1 in 100", {"sample_every": 100}), ("1% random", {"sample_rate": 0.01})):
+        sampled = HistogramSink()
+        sampled_noop = timing(noop, sink=sampled, **options)
+        elapsed = timeit.timeit(lambda: sampled_noop(1), number=number)
+        estimated = sampled.snapshot()["noop"]["count"]
+        print(f"{label:10}: {elapsed / number * 1e9:6.0f} ns/call, estimated {estimated} of {number} calls")
+
+    # Write per-call lines from a background thread instead of printing on the caller's thread
+    path = os.path.join(tempfile.mkdtemp(), "timing.log")
+    log = QueueLogSink(path, maxsize=100000, policy="block")
+    logged_noop = timing(noop, sink=log)
+    elapsed = timeit.timeit(lambda: logged_noop(1), number=number)
+    log.close()
+    with open(path) as file:
+        lines = sum(1 for _ in file)
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+    print(f"\nqueued log sink: {elapsed / number * 1e9:6.0f} ns/call, {lines} lines written")
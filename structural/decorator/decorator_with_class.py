@@ -1,16 +1,47 @@
+import asyncio
+import inspect
 import time
 from functools import wraps
 
-def timing_method(method):
+from metrics import (
+    AllocationTracker, CallTreeProfiler, HistogramSink, PrintSink, RingBufferSink, sampler, timing_async_generator,
+    timing_coroutine,
+)
+
+def timing_method(method, sink=None, sample_every=1, sample_rate=None, profiler=None, allocations=None):
     """
-    A method decorator that prints the time a method takes to execute.
+    A method decorator that records the time a method takes to execute.
+
+    Durations are measured with `time.perf_counter_ns` and handed to a sink, which
+    prints them by default.
 
     Parameters:
     method (function): The method to be decorated.
+    sink: An object with a `record(name, duration_ns, weight=1)` method receiving each measurement.
+    sample_every (int): Time one call out of every sample_every calls.
+    sample_rate (float): Time each call with this probability instead.
+    profiler (CallTreeProfiler): Also attribute the method's calls to call paths while the profiler is enabled.
+    allocations (AllocationTracker): Also record the method's allocations while the tracker is enabled.
 
     Returns:
     function: The wrapped method with timing functionality.
     """
+    if allocations is not None:
+        return allocations.wrap(timing_method(method, sink, sample_every, sample_rate, profiler), method.__qualname__)
+    if profiler is not None:
+        return profiler.wrap(timing_method(method, sink, sample_every, sample_rate), method.__qualname__)
+
+    record = (sink or PrintSink("Method")).record
+    name = method.__qualname__
+    perf_counter_ns = time.perf_counter_ns
+    skip, weight = sampler(sample_every, sample_rate)
+
+    # Time the whole await of coroutines and the whole iteration of async generators
+    if inspect.iscoroutinefunction(method):
+        return timing_coroutine(method, name, record, skip, weight)
+    if inspect.isasyncgenfunction(method):
+        return timing_async_generator(method, name, record, skip, weight)
+
     @wraps(method)
     def wrapper(*args, **kwargs):
         """
@@ -23,32 +54,72 @@ def timing_method(method):
         Returns:
         The result of the decorated method.
         """
-        start_time = time.time()  # Record the start time
+        start_time = perf_counter_ns()  # Record the start time
         result = method(*args, **kwargs)  # Call the original method with its arguments
-        end_time = time.time()  # Record the end time
-
-        # Calculate the duration and print it
-        duration = end_time - start_time
-        print(f"Method {method.__name__} took {duration:.4f} seconds to execute")
+        record(name, perf_counter_ns() - start_time)  # Hand the duration to the sink
 
         return result  # Return the result of the original method
 
-    return wrapper  # Return the wrapper function
+    if skip is None:
+        return wrapper  # Return the wrapper function
+
+    @wraps(method)
+    def sampled_wrapper(*args, **kwargs):
+        """
+        Wrapper function that times only the sampled calls of the decorated method.
+
+        Parameters:
+        *args: Variable length argument list for the decorated method.
+        **kwargs: Arbitrary keyword arguments for the decorated method.
+
+        Returns:
+        The result of the decorated method.
+        """
+        if skip():
+            return method(*args, **kwargs)  # Fast path for calls that are not sampled
+        start_time = perf_counter_ns()
+        result = method(*args, **kwargs)
+        record(name, perf_counter_ns() - start_time, weight)
+
+        return result
+
+    return sampled_wrapper  # Return the sampling wrapper function
 
-def timing_class(cls):
+def timing_class(cls=None, *, sink=None, sample_every=1, sample_rate=None, profiler=None, allocations=None):
     """
     A class decorator that applies the timing_method decorator to all methods of a class.
 
     Parameters:
     cls (class): The class to be decorated.
+    sink: An object with a `record(name, duration_ns, weight=1)` method shared by all methods,
+        e.g. a `HistogramSink` to get per-method percentiles.
+    sample_every (int): Time one call out of every sample_every calls of each method.
+    sample_rate (float): Time each call with this probability instead.
+    profiler (CallTreeProfiler): Build a call tree of the methods while the profiler is enabled.
+    allocations (AllocationTracker): Record the methods' allocations while the tracker is enabled.
+
+    Only methods defined on the class itself are wrapped, so methods inherited from an
+    already decorated base class are not timed twice. Static methods and class methods
+    keep their kind, and async methods are timed until their await completes.
 
     Returns:
     class: The decorated class with timing functionality added to its methods.
     """
-    for attr in dir(cls):
-        if callable(getattr(cls, attr)) and not attr.startswith("__"):
-            original_method = getattr(cls, attr)
-            decorated_method = timing_method(original_method)
+    if cls is None:
+        return lambda cls: timing_class(
+            cls, sink=sink, sample_every=sample_every, sample_rate=sample_rate, profiler=profiler,
+            allocations=allocations,
+        )
+
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("__"):
+            continue
+        if isinstance(value, (staticmethod, classmethod)):
+            # Wrap the underlying function and rebuild the descriptor around it
+            decorated_method = timing_method(value.__func__, sink, sample_every, sample_rate, profiler, allocations)
+            setattr(cls, attr, type(value)(decorated_method))
+        elif inspect.isfunction(value):
+            decorated_method = timing_method(value, sink, sample_every, sample_rate, profiler, allocations)
             setattr(cls, attr, decorated_method)
     return cls
 
@@ -88,6 +159,54 @@ class ExampleClass:
         time.sleep(n / 2)
         return "another_method completed"
 
+@timing_class
+class AsyncExampleClass:
+    """
+    A sample class to demonstrate timing async, static and class methods.
+    """
+
+    async def fetch(self, n):
+        """
+        A sample coroutine method that waits for n seconds without blocking the event loop.
+
+        Parameters:
+        n (float): The number of seconds to wait.
+
+        Returns:
+        str: A message indicating the method has completed.
+        """
+        await asyncio.sleep(n)
+        return "fetch completed"
+
+    async def stream(self, n):
+        """
+        A sample async generator method that yields n values, waiting 0.1 seconds for each.
+
+        Parameters:
+        n (int): The number of values to yield.
+        """
+        for i in range(n):
+            await asyncio.sleep(0.1)
+            yield i
+
+    @staticmethod
+    def static_method():
+        """A sample static method."""
+        return "static_method completed"
+
+    @classmethod
+    def class_method(cls):
+        """A sample class method."""
+        return f"{cls.__name__}.class_method completed"
+
+@timing_class
+class AsyncExampleSubclass(AsyncExampleClass):
+    """A subclass of a decorated class, whose inherited methods are not wrapped again."""
+
+    async def fetch_twice(self, n):
+        """Run two fetches concurrently."""
+        return await asyncio.gather(self.fetch(n), self.fetch(n))
+
 if __name__ == "__main__":
     # Create an instance of the decorated class
     example_instance = ExampleClass()
@@ -98,3 +217,79 @@ if __name__ == "__main__":
 
     result2 = example_instance.another_method(4)
     print(result2)
+
+    # Time async methods on a real event loop
+    async def main():
+        async_instance = AsyncExampleSubclass()
+        print(await async_instance.fetch(0.5))  # Reports ~0.5 seconds, not the time to create the coroutine
+        print([item async for item in async_instance.stream(3)])  # Reports ~0.3 seconds
+        print(await async_instance.fetch_twice(0.2))  # Reports ~0.2 seconds for each fetch and for fetch_twice
+        print(AsyncExampleSubclass.static_method())
+        print(AsyncExampleSubclass.class_method())
+
+    asyncio.run(main())
+
+    # Collect timings in memory and report them afterwards
+    buffer = RingBufferSink()
+
+    @timing_class(sink=buffer, sample_every=10)
+    class BufferedClass:
+        def fast_method(self, x):
+            return x * 2
+
+    buffered_instance = BufferedClass()
+    for i in range(1000):
+        buffered_instance.fast_method(i)
+    buffer.report()
+
+    # Profile nested method calls as a call tree, switched on only when needed
+    profiler = CallTreeProfiler()
+
+    @timing_class(sink=RingBufferSink(), profiler=profiler)
+    class Pipeline:
+        def run(self):
+            self.load()
+            self.transform()
+
+        def load(self):
+            time.sleep(0.01)
+
+        def transform(self):
+            time.sleep(0.02)
+            self.validate()
+
+        def validate(self):
+            time.sleep(0.005)
+
+    pipeline = Pipeline()
+    pipeline.run()  # Not profiled yet
+    profiler.enable()
+    for _ in range(3):
+        pipeline.run()
+    profiler.disable()
+
+    print()
+    profiler.export_collapsed()  # e.g. "Pipeline.run;Pipeline.transform 60000"
+
+    # Record allocated and peak bytes per method, switched on only when needed
+    allocations = AllocationTracker(HistogramSink())
+
+    @timing_class(sink=RingBufferSink(), allocations=allocations)
+    class Builder:
+        def build(self, n):
+            rows = [self.row(i) for i in range(n)]
+            return rows
+
+        def row(self, i):
+            scratch = [i] * 1000  # Freed before returning, so it only shows in the peak
+            return str(sum(scratch))
+
+    builder = Builder()
+    builder.build(100)  # Not tracked yet
+    allocations.enable()
+    kept = builder.build(100)
+    allocations.disable()
+
+    print()
+    for name, entry in sorted(allocations.sink.snapshot().items()):
+        print(f"{name}: {entry['count']} calls, p50 {entry['quantiles'][0.5]} bytes")
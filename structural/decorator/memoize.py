@@ -0,0 +1,287 @@
+import asyncio
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+class InFlightCall:
+    """
+    A call in progress that other threads asking for the same key wait on.
+    """
+
+    def __init__(self):
+        """Initialize the in-flight call."""
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+# Result handed to coroutines waiting on a call that was cancelled, telling them to try again
+RETRY = object()
+
+# Separates positional from keyword arguments in keys, private so no argument can equal it
+_KWARGS_MARK = object()
+
+def make_key(args, kwargs):
+    """
+    Build a hashable cache key from call arguments.
+
+    Parameters:
+    args (tuple): Positional arguments of the call.
+    kwargs (dict): Keyword arguments of the call, keyword order does not matter.
+
+    Returns:
+    tuple: The cache key.
+    """
+    if kwargs:
+        return args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+    return args
+
+def memoize(func=None, *, maxsize=128, ttl=None):
+    """
+    A decorator that caches the results of an expensive pure function.
+
+    The cache keeps at most `maxsize` results and evicts the least recently used one,
+    and results older than `ttl` seconds are recomputed. Concurrent misses on the same
+    key are coalesced: the function runs once and the other callers wait for its result
+    (single-flight), so a popular key that expires does not cause a stampede. Exceptions
+    are passed to every waiting caller and are not cached. Both regular and async
+    functions are supported. Concurrent awaits are coalesced within one event loop; if
+    the awaited call is cancelled, its waiters try again instead of being cancelled.
+
+    The wrapper exposes `cache_stats()` returning hits, misses, coalesced calls and
+    evictions, and `cache_clear()`.
+
+    Parameters:
+    func (function): The function to be decorated.
+    maxsize (int): The largest number of cached results, or None for no limit.
+    ttl (float): How long a result stays valid in seconds, or None for no expiry.
+
+    Returns:
+    function: The wrapped function with caching functionality.
+    """
+    if func is None:
+        return lambda func: memoize(func, maxsize=maxsize, ttl=ttl)
+
+    cache = OrderedDict()  # Maps a key to (result, expiry time)
+    in_flight = {}  # Maps a key, or (event loop, key) for coroutines, to the call computing it
+    lock = threading.Lock()  # Guards cache, in_flight and stats, never held while func runs
+    stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+    monotonic = time.monotonic
+
+    def lookup(key, flight_key):
+        """Return (True, result) on a hit, else (False, call) with call None for the caller that computes."""
+        entry = cache.get(key)
+        if entry is not None:
+            if ttl is None or entry[1] > monotonic():
+                cache.move_to_end(key)
+                stats["hits"] += 1
+                return True, entry[0]
+            del cache[key]
+        call = in_flight.get(flight_key)
+        if call is None:
+            stats["misses"] += 1
+        else:
+            stats["coalesced"] += 1
+        return False, call
+
+    def store(key, result):
+        """Cache a result, evicting the least recently used results beyond maxsize."""
+        cache[key] = (result, None if ttl is None else monotonic() + ttl)
+        cache.move_to_end(key)
+        if maxsize is not None:
+            while len(cache) > maxsize:
+                cache.popitem(last=False)
+                stats["evictions"] += 1
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            """
+            Wrapper coroutine that adds caching to the decorated coroutine function.
+
+            Parameters:
+            *args: Variable length argument list for the decorated function.
+            **kwargs: Arbitrary keyword arguments for the decorated function.
+
+            Returns:
+            The cached or freshly computed result.
+            """
+            key = make_key(args, kwargs)
+            # Futures belong to one event loop, so calls are only coalesced within a loop
+            flight_key = (asyncio.get_running_loop(), key)
+            while True:
+                with lock:
+                    hit, value = lookup(key, flight_key)
+                    if hit:
+                        return value
+                    if value is None:
+                        future = in_flight[flight_key] = asyncio.get_running_loop().create_future()
+                if value is None:
+                    break
+                # Shield the shared future so that a cancelled waiter does not cancel it for everyone
+                result = await asyncio.shield(value)
+                if result is not RETRY:
+                    return result
+                # The computing call was cancelled: try again, possibly computing it ourselves
+
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException as error:
+                with lock:
+                    del in_flight[flight_key]
+                if isinstance(error, asyncio.CancelledError):
+                    # Only the computing call was cancelled, the waiters retry instead
+                    future.set_result(RETRY)
+                else:
+                    future.set_exception(error)
+                    future.exception()  # Mark as retrieved, waiters still receive it
+                raise
+            with lock:
+                store(key, result)
+                del in_flight[flight_key]
+            future.set_result(result)
+            return result
+    else:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            """
+            Wrapper function that adds caching to the decorated function.
+
+            Parameters:
+            *args: Variable length argument list for the decorated function.
+            **kwargs: Arbitrary keyword arguments for the decorated function.
+
+            Returns:
+            The cached or freshly computed result.
+            """
+            key = make_key(args, kwargs)
+            with lock:
+                hit, value = lookup(key, key)
+                if hit:
+                    return value
+                if value is None:
+                    call = in_flight[key] = InFlightCall()
+            if value is not None:
+                # Another thread is computing this key, wait for its result
+                value.event.wait()
+                if value.error is not None:
+                    raise value.error
+                return value.result
+
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as error:
+                call.error = error
+                with lock:
+                    del in_flight[key]
+                call.event.set()
+                raise
+            with lock:
+                store(key, result)
+                del in_flight[key]
+            call.result = result
+            call.event.set()
+            return result
+
+    def cache_stats():
+        """Return the hit, miss, coalesced and eviction counters and the current size."""
+        with lock:
+            return dict(stats, size=len(cache))
+
+    def cache_clear():
+        """Drop every cached result and reset the counters."""
+        with lock:
+            cache.clear()
+            stats.update(hits=0, misses=0, coalesced=0, evictions=0)
+
+    wrapper.cache_stats = cache_stats
+    wrapper.cache_clear = cache_clear
+    return wrapper
+
+# Example usage of the @memoize decorator
+
+@memoize(maxsize=2, ttl=60)
+def slow_square(n):
+    """
+    A sample function that takes 0.1 seconds to square a number.
+
+    Parameters:
+    n (int): The number to square.
+
+    Returns:
+    int: The square of n.
+    """
+    time.sleep(0.1)
+    return n * n
+
+@memoize(ttl=1)
+async def slow_lookup(key):
+    """
+    A sample coroutine that takes 0.1 seconds to look up a key.
+
+    Parameters:
+    key (str): The key to look up.
+
+    Returns:
+    str: The value for the key.
+    """
+    await asyncio.sleep(0.1)
+    return key.upper()
+
+def stampede(function, threads=32, rounds=5):
+    """
+    Call a function with the same few keys from many threads at once.
+
+    Parameters:
+    function (function): The cached function to call.
+    threads (int): The number of threads calling it.
+    rounds (int): The number of calls each thread makes.
+
+    Returns:
+    float: The elapsed time in seconds.
+    """
+    def work(seed):
+        for i in range(rounds):
+            function((seed + i) % 4)
+
+    workers = [threading.Thread(target=work, args=(seed,)) for seed in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    # Repeated calls are served from the cache
+    print(slow_square(3), slow_square(3), slow_square(4), slow_square(5))  # Output: 9 9 16 25
+    print(slow_square.cache_stats())  # Output: 1 hit, 3 misses, 1 eviction
+
+    # Concurrent awaits of the same key run the coroutine once
+    async def main():
+        return await asyncio.gather(*(slow_lookup("tenant") for _ in range(100)))
+
+    results = asyncio.run(main())
+    print(results[0], len(results), slow_lookup.cache_stats())  # Output: TENANT 100, 1 miss, 99 coalesced
+
+    # Compare how often an expensive function runs under contention
+    executions = {"lru_cache": 0, "memoize": 0}
+
+    @functools.lru_cache(maxsize=128)
+    def lru_cached(n):
+        executions["lru_cache"] += 1
+        time.sleep(0.05)
+        return n * n
+
+    @memoize(maxsize=128)
+    def memoized(n):
+        executions["memoize"] += 1
+        time.sleep(0.05)
+        return n * n
+
+    print()
+    for label, function in (("lru_cache", lru_cached), ("memoize", memoized)):
+        elapsed = stampede(function)
+        print(f"{label:9}: {executions[label]:3} executions for 4 keys, {elapsed:.2f} seconds")
@@ -0,0 +1,743 @@
+import atexit
+import contextvars
+import inspect
+import itertools
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import deque
+from functools import wraps
+
+def sampler(sample_every=1, sample_rate=None):
+    """
+    Decide which calls a timing decorator measures.
+
+    Timing every call is the default. With `sample_every=n` only every n-th call is
+    timed, with `sample_rate=p` each call is timed with probability p. Each sampled
+    measurement is recorded with a weight of 1 / (sampled fraction), so counts and sums
+    reported by the sinks estimate all calls.
+
+    Parameters:
+    sample_every (int): Time one call out of every sample_every calls.
+    sample_rate (float): Time each call with this probability instead.
+
+    Returns:
+    tuple: (skip, weight), where skip() returns True for calls that should not be timed,
+        or is None when every call is timed.
+    """
+    if sample_rate is not None:
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be in (0, 1]")
+        if sample_rate == 1:
+            return None, 1
+        random_value = random.random
+        return (lambda: random_value() >= sample_rate), 1 / sample_rate
+    if sample_every < 1:
+        raise ValueError("sample_every must be at least 1")
+    if sample_every == 1:
+        return None, 1
+    # Cycling through a tuple is a single C call per decision
+    return itertools.cycle((False,) + (True,) * (sample_every - 1)).__next__, sample_every
+
+def timing_coroutine(func, name, record, skip=None, weight=1):
+    """
+    Wrap a coroutine function so that the whole await is timed, not just creating the coroutine.
+
+    Parameters:
+    func (function): The coroutine function to be wrapped.
+    name (str): The name measurements are recorded under.
+    record (callable): The sink's record method.
+    skip (callable): Returns True for calls that should not be timed, see `sampler`.
+    weight: The weight of each sampled measurement.
+
+    Returns:
+    function: The wrapped coroutine function.
+    """
+    perf_counter_ns = time.perf_counter_ns
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        if skip is not None and skip():
+            return await func(*args, **kwargs)
+        start_time = perf_counter_ns()
+        result = await func(*args, **kwargs)
+        record(name, perf_counter_ns() - start_time, weight)
+        return result
+
+    return wrapper
+
+def timing_async_generator(func, name, record, skip=None, weight=1):
+    """
+    Wrap an async generator function so that the time until it finishes or is closed is timed.
+
+    Parameters:
+    func (function): The async generator function to be wrapped.
+    name (str): The name measurements are recorded under.
+    record (callable): The sink's record method.
+    skip (callable): Returns True for calls that should not be timed, see `sampler`.
+    weight: The weight of each sampled measurement.
+
+    Returns:
+    function: The wrapped async generator function.
+    """
+    perf_counter_ns = time.perf_counter_ns
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        timed = skip is None or not skip()
+        if timed:
+            start_time = perf_counter_ns()
+        generator = func(*args, **kwargs)
+        try:
+            # Delegate like `yield from` would, so asend, athrow and aclose reach the generator
+            item = await generator.asend(None)
+            while True:
+                try:
+                    sent = yield item
+                except GeneratorExit:
+                    raise
+                except BaseException as error:
+                    item = await generator.athrow(error)
+                else:
+                    item = await generator.asend(sent)
+        except StopAsyncIteration:
+            return
+        finally:
+            try:
+                await generator.aclose()
+            finally:
+                if timed:
+                    record(name, perf_counter_ns() - start_time, weight)
+
+    return wrapper
+
+class PrintSink:
+    """
+    A sink that prints every measurement as soon as it is recorded.
+
+    This is the original behaviour of the timing decorators. It is convenient for
+    examples but performs synchronous I/O on every call.
+    """
+
+    def __init__(self, kind="Function"):
+        """
+        Initialize the sink.
+
+        Parameters:
+        kind (str): The word printed before the name, e.g. "Function" or "Method".
+        """
+        self.kind = kind
+
+    def record(self, name, duration_ns, weight=1):
+        """
+        Print a single measurement.
+
+        Parameters:
+        name (str): The name of the timed function or method.
+        duration_ns (int): The measured duration in nanoseconds.
+        weight: The number of calls the measurement stands for, unused when printing.
+        """
+        print(f"{self.kind} {name} took {duration_ns / 1e9:.4f} seconds to execute")
+
+class QueueLogSink:
+    """
+    A sink that writes one line per measurement from a background thread.
+
+    `record` only appends the measurement to a bounded in-memory queue; a writer thread
+    formats the queued lines and writes them to the file in batches. When the queue is
+    full, the "drop" policy discards the measurement and counts it in `dropped`, while
+    the "block" policy makes the caller wait until the writer has drained a batch.
+    Pending lines are flushed at interpreter exit; measurements recorded after `close`
+    are dropped and counted in `dropped` under either policy.
+
+    `record(name, duration_ns, weight=1)` is bound to the policy's implementation when
+    the sink is created.
+    """
+
+    def __init__(self, path, kind="Function", maxsize=10000, policy="drop", batch_size=512, interval=0.05):
+        """
+        Initialize the sink and start its writer thread.
+
+        Parameters:
+        path (str): The file the lines are appended to.
+        kind (str): The word written before the name, e.g. "Function" or "Method".
+        maxsize (int): The number of measurements the queue holds.
+        policy (str): "drop" or "block", what to do when the queue is full.
+        batch_size (int): The largest number of lines written per batch.
+        interval (float): How long the writer sleeps when the queue is empty, in seconds.
+        """
+        if policy not in ("drop", "block"):
+            raise ValueError("policy must be 'drop' or 'block'")
+        self.kind = kind
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue = deque()  # append and popleft are atomic, so no lock is needed
+        self._closing = threading.Event()
+        self._closed = False  # Checked by record, a plain attribute is cheaper than the event
+        if policy == "block":
+            lock = threading.Lock()
+            self._room = threading.Condition(lock)  # Notified by the writer after draining a batch
+            self._full = threading.Condition(lock)  # Notified by callers waiting for room
+        else:
+            self._room = None
+        self._file = open(path, "a")
+        self.record = self._record_or_drop if policy == "drop" else self._record_or_block
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _record_or_drop(self, name, duration_ns, weight=1):
+        """Queue a measurement, dropping it when the queue is full or the sink is closed."""
+        if len(self._queue) >= self.maxsize or self._closed:
+            self.dropped += 1
+        else:
+            self._queue.append((name, duration_ns))
+
+    def _record_or_block(self, name, duration_ns, weight=1):
+        """Queue a measurement, waiting for the writer to make room when the queue is full."""
+        if len(self._queue) >= self.maxsize:
+            with self._room:
+                while len(self._queue) >= self.maxsize and not self._closed:
+                    self._full.notify()  # Wake the writer in case it is waiting for lines
+                    self._room.wait()
+        if self._closed:
+            self.dropped += 1
+        else:
+            self._queue.append((name, duration_ns))
+
+    def close(self):
+        """Write the pending lines, stop the writer thread and close the file."""
+        if self._file.closed:
+            return
+        self._closed = True
+        self._closing.set()
+        if self._room is not None:
+            with self._room:
+                self._room.notify_all()  # Blocked callers drop their measurements
+                self._full.notify()
+        self._writer.join()
+        self._file.close()
+        atexit.unregister(self.close)
+
+    def _write_loop(self):
+        """Write queued measurements in batches until close is called."""
+        popleft = self._queue.popleft
+        while True:
+            closing = self._closing.is_set()
+            batch = []
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(popleft())
+            except IndexError:
+                pass
+            if batch:
+                self._file.writelines(
+                    f"{self.kind} {name} took {duration_ns / 1e9:.4f} seconds to execute\n"
+                    for name, duration_ns in batch
+                )
+                self._file.flush()
+                if self._room is not None:
+                    with self._room:
+                        self._room.notify_all()
+            elif closing:
+                return  # Everything queued before close has been written
+            elif self._room is not None:
+                with self._full:
+                    if not self._queue and not self._closed:
+                        self._full.wait(self.interval)
+            else:
+                self._closing.wait(self.interval)
+
+class RingBufferSink:
+    """
+    A sink that stores measurements in a preallocated in-memory ring buffer.
+
+    Recording a measurement only writes one slot, so it is cheap enough for hot paths.
+    Once the buffer is full the oldest measurements are overwritten. Reporting is done
+    on demand with `snapshot` or `summary`, away from the timed code.
+    """
+
+    def __init__(self, capacity=65536):
+        """
+        Initialize the sink.
+
+        Parameters:
+        capacity (int): The number of measurements kept, rounded up to a power of two.
+        """
+        self.capacity = 1 << (capacity - 1).bit_length()
+        self._mask = self.capacity - 1
+        self.entries = [None] * self.capacity
+        self._counter = itertools.count()  # next() on a count is atomic in CPython
+
+    def record(self, name, duration_ns, weight=1):
+        """
+        Store a single measurement.
+
+        Parameters:
+        name (str): The name of the timed function or method.
+        duration_ns (int): The measured duration in nanoseconds.
+        weight: The number of calls the measurement stands for when calls are sampled.
+        """
+        index = next(self._counter)
+        self.entries[index & self._mask] = (index, name, duration_ns, weight)
+
+    def snapshot(self):
+        """
+        Return the measurements currently held in the buffer, oldest first.
+
+        Returns:
+        list: (name, duration_ns, weight) tuples.
+        """
+        entries = sorted(entry for entry in self.entries if entry is not None)
+        return [entry[1:] for entry in entries]
+
+    def summary(self):
+        """
+        Aggregate the buffered measurements per name.
+
+        Returns:
+        dict: Maps each name to its count, total, min, max and mean duration in nanoseconds.
+        """
+        stats = {}
+        for name, duration_ns, weight in self.snapshot():
+            entry = stats.get(name)
+            if entry is None:
+                stats[name] = {"count": weight, "total": duration_ns * weight, "min": duration_ns, "max": duration_ns}
+            else:
+                entry["count"] += weight
+                entry["total"] += duration_ns * weight
+                entry["min"] = min(entry["min"], duration_ns)
+                entry["max"] = max(entry["max"], duration_ns)
+        for entry in stats.values():
+            entry["mean"] = entry["total"] / entry["count"]
+        return stats
+
+    def report(self):
+        """Print the summary of the buffered measurements."""
+        for name, entry in sorted(self.summary().items()):
+            print(f"{name}: {entry['count']:.0f} calls, mean {entry['mean'] / 1e3:.2f} us, "
+                  f"min {entry['min'] / 1e3:.2f} us, max {entry['max'] / 1e3:.2f} us")
+
+# Histogram layout: values below 2 ** SUB_BUCKET_BITS get a bucket each, every larger power
+# of two is split into 2 ** SUB_BUCKET_BITS buckets, which bounds the relative error to ~6%.
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_TRACKABLE_NS = (1 << 40) - 1  # About 18 minutes, longer durations are clamped
+BUCKET_COUNT = (MAX_TRACKABLE_NS.bit_length() - SUB_BUCKET_BITS) * SUB_BUCKETS + SUB_BUCKETS
+
+def bucket_index(value):
+    """
+    Map a duration to its histogram bucket.
+
+    Parameters:
+    value (int): A non-negative duration in nanoseconds.
+
+    Returns:
+    int: The index of the bucket holding the value.
+    """
+    if value > MAX_TRACKABLE_NS:
+        value = MAX_TRACKABLE_NS
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    if shift <= 0:
+        return value
+    return shift * SUB_BUCKETS + (value >> shift)
+
+def bucket_upper_bound(index):
+    """
+    Return the largest duration that falls into a bucket.
+
+    Parameters:
+    index (int): The index of the bucket.
+
+    Returns:
+    int: The bucket's inclusive upper bound in nanoseconds.
+    """
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    return ((index - shift * SUB_BUCKETS + 1) << shift) - 1
+
+class ThreadHistograms:
+    """
+    The histograms of one thread, kept alive by that thread's local storage only.
+    """
+
+    __slots__ = ("histograms", "__weakref__")
+
+    def __init__(self):
+        """Initialize the thread's empty histograms."""
+        self.histograms = {}  # Maps a name to its bucket counts, with the sum in the last slot
+
+def fold_histograms(lock, threads, retired, key):
+    """Move the histograms of a thread that exited into the merged histograms of exited threads."""
+    with lock:
+        for name, counts in threads.pop(key).items():
+            total = retired.setdefault(name, [0] * (BUCKET_COUNT + 1))
+            for index, count in enumerate(counts):
+                if count:
+                    total[index] += count
+
+class HistogramSink:
+    """
+    A sink that keeps a fixed-size, log-bucketed latency histogram per name.
+
+    Every thread records into its own histograms, so the hot path takes no lock. The
+    per-thread histograms are merged when a snapshot is taken, and a thread's histograms
+    are folded into one shared set when the thread exits, so memory stays bounded
+    however many threads come and go.
+    """
+
+    def __init__(self):
+        """Initialize the sink."""
+        self._local = threading.local()
+        self._lock = threading.Lock()  # Guards the two dicts below
+        self._threads = {}  # Maps a key per live thread to that thread's histograms
+        self._retired = {}  # Merged histograms of the threads that have exited
+
+    def record(self, name, duration_ns, weight=1):
+        """
+        Count a single measurement.
+
+        Parameters:
+        name (str): The name of the timed function or method.
+        duration_ns (int): The measured duration in nanoseconds.
+        weight: The number of calls the measurement stands for when calls are sampled.
+        """
+        try:
+            counts = self._local.histograms[name]
+        except (AttributeError, KeyError):
+            counts = self._new_histogram(name)
+        counts[bucket_index(duration_ns)] += weight
+        counts[BUCKET_COUNT] += duration_ns * weight  # The extra last slot holds the sum
+
+    def _new_histogram(self, name):
+        """Create this thread's histogram for a name."""
+        if not hasattr(self._local, "histograms"):
+            owner = self._local.owner = ThreadHistograms()
+            self._local.histograms = owner.histograms
+            key = id(owner)
+            with self._lock:
+                self._threads[key] = owner.histograms
+            # The owner dies with the thread's local storage, which folds its histograms away
+            weakref.finalize(owner, fold_histograms, self._lock, self._threads, self._retired, key)
+        counts = [0] * (BUCKET_COUNT + 1)
+        with self._lock:
+            self._local.histograms[name] = counts
+        return counts
+
+    def merged(self):
+        """
+        Merge the per-thread histograms.
+
+        Returns:
+        dict: Maps each name to its merged bucket counts, with the sum in the last slot.
+        """
+        with self._lock:
+            # Copy the retired counts, as a thread exiting later adds to them
+            histograms = [(name, list(counts)) for name, counts in self._retired.items()]
+            for thread_histograms in self._threads.values():
+                histograms.extend(thread_histograms.items())
+        merged = {}
+        for name, counts in histograms:
+            total = merged.setdefault(name, [0] * (BUCKET_COUNT + 1))
+            for index, count in enumerate(counts):
+                if count:
+                    total[index] += count
+        return merged
+
+    def snapshot(self, quantiles=(0.5, 0.99, 0.999)):
+        """
+        Summarise the latency of every name.
+
+        Parameters:
+        quantiles (tuple): The quantiles to compute.
+
+        Returns:
+        dict: Maps each name to its count, sum and quantiles, all durations in nanoseconds.
+        """
+        snapshot = {}
+        for name, counts in self.merged().items():
+            # Sampled measurements carry fractional weights, so round the estimates
+            total = sum(counts[:BUCKET_COUNT])
+            entry = {"count": round(total), "sum": round(counts[BUCKET_COUNT]), "quantiles": {}}
+            for quantile in quantiles:
+                rank = quantile * total
+                seen = 0
+                for index in range(BUCKET_COUNT):
+                    seen += counts[index]
+                    if seen >= rank:
+                        entry["quantiles"][quantile] = bucket_upper_bound(index)
+                        break
+            snapshot[name] = entry
+        return snapshot
+
+    def export_prometheus(self, path=None, metric="timing_duration_seconds", scale=1e9,
+                          description="Execution time of decorated functions and methods."):
+        """
+        Write the latency of every name in the Prometheus text exposition format.
+
+        Parameters:
+        path (str): The file to write, or None for stdout.
+        metric (str): The name of the exported summary metric.
+        scale (float): The recorded values are divided by this, 1e9 turns nanoseconds into seconds.
+        description (str): The HELP text of the metric.
+        """
+        lines = [
+            f"# HELP {metric} {description}",
+            f"# TYPE {metric} summary",
+        ]
+        for name, entry in sorted(self.snapshot().items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for quantile, value in entry["quantiles"].items():
+                lines.append(f'{metric}{{function="{label}",quantile="{quantile}"}} {value / scale:.9f}')
+            lines.append(f'{metric}_sum{{function="{label}"}} {entry["sum"] / scale:.9f}')
+            lines.append(f'{metric}_count{{function="{label}"}} {entry["count"]}')
+        text = "\n".join(lines) + "\n"
+        if path is None:
+            sys.stdout.write(text)
+        else:
+            with open(path, "w") as file:
+                file.write(text)
+
+class CallTreeProfiler:
+    """
+    Profiler accumulating inclusive and exclusive time per call path.
+
+    The current call path is kept in a context variable, so nested calls are attributed
+    correctly per thread and per asyncio task. Functions wrapped by the profiler check
+    `enabled` on each call, so profiling can be switched on and off at runtime without
+    decorating anything again. Exclusive time may be understated for callers that run
+    children concurrently, e.g. with asyncio.gather.
+    """
+
+    def __init__(self, enabled=False):
+        """
+        Initialize the profiler.
+
+        Parameters:
+        enabled (bool): Whether calls are profiled from the start.
+        """
+        self.enabled = enabled
+        self._path = contextvars.ContextVar(f"call_path_{id(self)}", default=())
+        self._lock = threading.Lock()
+        self._stats = {}  # Maps a call path to [calls, inclusive_ns, children_ns]
+
+    def enable(self):
+        """Start profiling calls."""
+        self.enabled = True
+
+    def disable(self):
+        """Stop profiling calls, keeping what was collected so far."""
+        self.enabled = False
+
+    def reset(self):
+        """Discard everything collected so far."""
+        with self._lock:
+            self._stats.clear()
+
+    def wrap(self, func, name):
+        """
+        Wrap a function so that its calls are profiled while the profiler is enabled.
+
+        Parameters:
+        func (function): The function or coroutine function to be wrapped.
+        name (str): The frame name used for the function in call paths.
+
+        Returns:
+        function: The wrapped function.
+        """
+        if inspect.isasyncgenfunction(func):
+            # Frames cannot stay open across the yields of an async generator
+            return func
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return await func(*args, **kwargs)
+                parent, token, start_time = self._enter(name)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self._exit(parent, token, start_time)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                parent, token, start_time = self._enter(name)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self._exit(parent, token, start_time)
+        return wrapper
+
+    def _enter(self, name):
+        """Push a frame onto the current call path."""
+        parent = self._path.get()
+        token = self._path.set(parent + (name,))
+        return parent, token, time.perf_counter_ns()
+
+    def _exit(self, parent, token, start_time):
+        """Pop a frame and charge its time to its path and to its parent."""
+        elapsed = time.perf_counter_ns() - start_time
+        path = self._path.get()
+        self._path.reset(token)
+        with self._lock:
+            entry = self._stats.setdefault(path, [0, 0, 0])
+            entry[0] += 1
+            entry[1] += elapsed
+            if parent:
+                self._stats.setdefault(parent, [0, 0, 0])[2] += elapsed
+
+    def stats(self):
+        """
+        Return the collected time per call path.
+
+        Returns:
+        dict: Maps each call path (a tuple of names) to its calls, inclusive and exclusive time in nanoseconds.
+        """
+        with self._lock:
+            items = [(path, list(entry)) for path, entry in self._stats.items()]
+        return {
+            path: {"calls": calls, "inclusive": inclusive, "exclusive": max(0, inclusive - children)}
+            for path, (calls, inclusive, children) in items
+        }
+
+    def collapsed(self):
+        """
+        Render the profile as collapsed stacks, one "a;b;c <microseconds>" line per path.
+
+        The values are exclusive time in microseconds, so the output can be fed to
+        flamegraph tools such as flamegraph.pl or speedscope.
+
+        Returns:
+        str: The collapsed-stack lines.
+        """
+        lines = []
+        for path, entry in sorted(self.stats().items()):
+            exclusive_us = entry["exclusive"] // 1000
+            if exclusive_us:
+                lines.append(f"{';'.join(path)} {exclusive_us}\n")
+        return "".join(lines)
+
+    def export_collapsed(self, path=None):
+        """
+        Write the collapsed stacks to a file or to stdout.
+
+        Parameters:
+        path (str): The file to write, or None for stdout.
+        """
+        if path is None:
+            sys.stdout.write(self.collapsed())
+        else:
+            with open(path, "w") as file:
+                file.write(self.collapsed())
+
+class AllocationTracker:
+    """
+    Records how much memory decorated functions allocate, using tracemalloc.
+
+    For every call made while the tracker is enabled, the net bytes still allocated when
+    the call returns and the peak bytes allocated during the call are handed to sinks,
+    so they can be aggregated like timings, e.g. with a `HistogramSink`. tracemalloc is
+    only running while the tracker is enabled; when it is disabled a wrapped call costs
+    a single attribute check. tracemalloc is process-wide, so allocations made by other
+    threads or coroutines during a call are counted too.
+    """
+
+    def __init__(self, sink=None, peak_sink=None, enabled=False):
+        """
+        Initialize the tracker.
+
+        Parameters:
+        sink: An object with a `record(name, value, weight=1)` method receiving net allocated bytes.
+        peak_sink: The same kind of object receiving peak bytes, defaults to `sink`.
+        enabled (bool): Whether calls are tracked from the start.
+        """
+        self.sink = sink or HistogramSink()
+        self.peak_sink = peak_sink or self.sink
+        self.enabled = False
+        self._started_tracemalloc = False
+        self._lock = threading.Lock()
+        self._open_peaks = {}  # Maps id(cell) to the one-item peak cell of each unfinished call
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        """Start tracemalloc if needed and start tracking calls."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.enabled = True
+
+    def disable(self):
+        """Stop tracking calls, and stop tracemalloc if the tracker started it."""
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def wrap(self, func, name):
+        """
+        Wrap a function so that its allocations are recorded while the tracker is enabled.
+
+        Parameters:
+        func (function): The function or coroutine function to be wrapped.
+        name (str): The name allocations are recorded under; peaks use name + " peak".
+
+        Returns:
+        function: The wrapped function.
+        """
+        peak_name = f"{name} peak"
+        if inspect.isasyncgenfunction(func):
+            # Allocations between the yields of an async generator cannot be attributed to it
+            return func
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return await func(*args, **kwargs)
+                start, cell = self._enter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self._exit(start, cell, name, peak_name)
+        else:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start, cell = self._enter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self._exit(start, cell, name, peak_name)
+        return wrapper
+
+    def _enter(self):
+        """Remember the current allocation and give the call its own peak."""
+        cell = [0]
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            # The peak is process-wide, so every unfinished call, whichever thread or task
+            # runs it, keeps the peak so far before it is reset below
+            for open_cell in self._open_peaks.values():
+                if open_cell[0] < peak:
+                    open_cell[0] = peak
+            tracemalloc.reset_peak()
+            self._open_peaks[id(cell)] = cell
+        return current, cell
+
+    def _exit(self, start, cell, name, peak_name):
+        """Record the call's net and peak allocation."""
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            del self._open_peaks[id(cell)]
+        peak = max(cell[0], peak)
+        self.sink.record(name, max(0, current - start))
+        self.peak_sink.record(peak_name, max(0, peak - start))